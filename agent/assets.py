@@ -0,0 +1,263 @@
+"""Image asset optimization for scenes.
+
+Logos and backgrounds are usually referenced at their original resolution and
+Chromium decodes and downsamples them on every load (and repaints them every frame
+when they pan). ``optimize_scene_assets`` measures how large each raster image is
+actually drawn over the scene's timeline, writes right-sized, re-encoded variants
+into a content-hashed cache and rewrites the scene to reference them.
+
+Only local raster files referenced from the scene HTML itself (``<img src>`` and
+inline/``<style>`` ``url(...)``) are rewritten; remote URLs, data URIs, SVGs and
+GIFs are left alone.
+
+Requires Pillow (``pip install -e '.[assets]'``) and Playwright.
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from .renderer import load_scene, unscale_container
+
+RASTER_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp"}
+FORMATS = {"webp": "WEBP", "avif": "AVIF", "png": "PNG"}
+
+# Every drawn raster image: <img> elements and CSS background layers.
+_COLLECT_JS = """
+() => {
+  const out = [];
+  for (const el of document.querySelectorAll('*')) {
+    const r = el.getBoundingClientRect();
+    if (r.width === 0 || r.height === 0) continue;
+    const cs = getComputedStyle(el);
+    if (cs.display === 'none' || cs.visibility === 'hidden') continue;
+    if (el.tagName === 'IMG' && el.currentSrc) {
+      out.push({url: el.currentSrc, w: r.width, h: r.height, fit: cs.objectFit});
+    }
+    if (cs.backgroundImage && cs.backgroundImage !== 'none') {
+      const urls = [...cs.backgroundImage.matchAll(/url\\("?(.*?)"?\\)/g)].map(m => m[1]);
+      const sizes = cs.backgroundSize.split(',').map(s => s.trim());
+      urls.forEach((url, i) => out.push({url, w: r.width, h: r.height, fit: sizes[i % sizes.length]}));
+    }
+  }
+  return out;
+}
+"""
+
+
+@dataclass(frozen=True)
+class AssetVariant:
+    source: Path
+    path: Path
+    width: int
+    height: int
+    source_width: int
+    source_height: int
+    source_bytes: int
+    bytes: int
+
+
+def draw_scale(fit: str, box_w: float, box_h: float, nat_w: int, nat_h: int) -> float:
+    """Largest scale factor at which an image of natural size (nat_w, nat_h) is drawn.
+
+    ``fit`` is an ``object-fit`` value for ``<img>`` or a ``background-size`` layer
+    value for CSS backgrounds. Non-uniform stretching ("fill", "100% 50%") is
+    reported as the larger of the two axis scales, since variants keep the aspect ratio.
+    """
+    sx, sy = box_w / nat_w, box_h / nat_h
+    if fit in ("cover", "fill"):
+        return max(sx, sy)
+    if fit == "contain":
+        return min(sx, sy)
+    if fit == "scale-down":
+        return min(1.0, sx, sy)
+    if fit in ("none", "auto", "auto auto", ""):
+        return 1.0
+
+    parts = fit.split()
+    if len(parts) == 1:
+        parts.append("auto")
+
+    def _axis(token: str, box: float, nat: int) -> Optional[float]:
+        if token.endswith("%"):
+            return float(token[:-1]) / 100 * box / nat
+        if token.endswith("px"):
+            return float(token[:-2]) / nat
+        return None  # auto
+
+    ax, ay = _axis(parts[0], box_w, nat_w), _axis(parts[1], box_h, nat_h)
+    if ax is None and ay is None:
+        return 1.0
+    return max(s for s in (ax, ay) if s is not None)
+
+
+def sample_draws(
+    page: Any,
+    *,
+    duration_ms: int,
+    sample_fps: int = 10,
+    selector: str = ".shorts-container",
+) -> Dict[Path, List[Tuple[str, float, float]]]:
+    """Collect every draw of a local file in an already loaded scene (see ``measure_draw_scales``).
+
+    The container's preview scale is undone first, so boxes are measured at the
+    size the final frames are rendered at.
+    """
+    unscale_container(page, selector)
+    draws: Dict[Path, set] = {}
+    n_samples = int(duration_ms / 1000 * sample_fps) + 1
+    for i in range(n_samples):
+        page.evaluate(f"window.__seekToTime({i * 1000 / sample_fps})")
+        for d in page.evaluate(_COLLECT_JS):
+            url = urlparse(d["url"])
+            if url.scheme != "file":
+                continue
+            path = Path(unquote(url.path)).resolve()
+            draws.setdefault(path, set()).add((d["fit"], round(d["w"], 1), round(d["h"], 1)))
+    return {path: sorted(v) for path, v in draws.items()}
+
+
+def measure_draw_scales(
+    html_path: Path,
+    *,
+    duration_ms: int,
+    sample_fps: int = 10,
+    width: int = 1080,
+    height: int = 1920,
+    selector: str = ".shorts-container",
+) -> Dict[Path, List[Tuple[str, float, float]]]:
+    """Sample the scene under the virtual clock and collect every draw of local files.
+
+    Returns ``{file: [(fit, box_w, box_h), ...]}`` (deduplicated). Sampling the whole
+    timeline catches images that are scaled up or revealed later in the scene.
+    """
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page(viewport={"width": width, "height": height})
+        load_scene(page, html_path)
+        draws = sample_draws(page, duration_ms=duration_ms, sample_fps=sample_fps, selector=selector)
+        browser.close()
+    return draws
+
+
+def make_variant(
+    source: Path,
+    *,
+    scale: float,
+    cache_dir: Path,
+    fmt: str = "webp",
+    quality: int = 90,
+) -> Optional[AssetVariant]:
+    """Write a right-sized ``fmt`` variant of ``source`` into ``cache_dir``.
+
+    The file name is derived from the source content and the encode settings, so an
+    existing variant is reused as-is. Returns ``None`` when the variant would be no
+    smaller than the original (same size and more bytes).
+    """
+    from PIL import Image, features
+
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format {fmt!r} (expected one of {sorted(FORMATS)})")
+    if fmt == "avif" and not features.check("avif"):
+        raise ValueError("This Pillow build has no AVIF support")
+
+    data = source.read_bytes()
+    with Image.open(source) as img:
+        nat_w, nat_h = img.size
+        scale = min(1.0, scale)
+        w, h = max(1, math.ceil(nat_w * scale)), max(1, math.ceil(nat_h * scale))
+        key = hashlib.sha256(data + f"|{w}x{h}|{fmt}|{quality}".encode()).hexdigest()[:16]
+        out = cache_dir / f"{source.stem}-{key}.{fmt}"
+        if not out.exists():
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            if img.mode not in ("RGB", "RGBA"):
+                # Palette/greyscale PNGs: resample in full colour, keep transparency
+                has_alpha = "A" in img.getbands() or "transparency" in img.info
+                img = img.convert("RGBA" if has_alpha else "RGB")
+            resized = img if (w, h) == (nat_w, nat_h) else img.resize((w, h), Image.LANCZOS)
+            if fmt == "png":
+                save_kwargs = {"optimize": True}
+            else:
+                save_kwargs = {"quality": quality, "method": 6} if fmt == "webp" else {"quality": quality}
+            tmp = out.with_suffix(out.suffix + ".tmp")
+            resized.save(tmp, format=FORMATS[fmt], **save_kwargs)
+            os.replace(tmp, out)
+
+    variant = AssetVariant(
+        source=source,
+        path=out,
+        width=w,
+        height=h,
+        source_width=nat_w,
+        source_height=nat_h,
+        source_bytes=len(data),
+        bytes=out.stat().st_size,
+    )
+    if (w, h) == (nat_w, nat_h) and variant.bytes >= variant.source_bytes:
+        return None
+    return variant
+
+
+_REF_RE = re.compile(r"""(?P<pre>\bsrc\s*=\s*["']|url\(\s*["']?)(?P<ref>[^"')]+)""")
+
+
+def rewrite_references(html: str, html_dir: Path, variants: Dict[Path, AssetVariant]) -> str:
+    """Point ``src="..."`` / ``url(...)`` references at their optimized variants."""
+
+    def _sub(m: re.Match) -> str:
+        ref = m.group("ref").strip()
+        if re.match(r"^[a-z][a-z0-9+.-]*:", ref) and not ref.startswith("file:"):
+            return m.group(0)  # http(s):, data:, ...
+        target = Path(unquote(urlparse(ref).path))
+        path = (target if target.is_absolute() else html_dir / target).resolve()
+        variant = variants.get(path)
+        if variant is None:
+            return m.group(0)
+        return m.group("pre") + Path(os.path.relpath(variant.path, html_dir)).as_posix()
+
+    return _REF_RE.sub(_sub, html)
+
+
+def optimize_scene_assets(
+    html_path: Path,
+    *,
+    cache_dir: Path,
+    duration_ms: int,
+    out_html_path: Optional[Path] = None,
+    fmt: str = "webp",
+    quality: int = 90,
+    sample_fps: int = 10,
+) -> List[AssetVariant]:
+    """Measure, re-encode and rewrite the images used by a scene.
+
+    Writes the rewritten HTML to ``out_html_path`` (default: ``html_path`` in place)
+    and returns the variants it now references.
+    """
+    draws = measure_draw_scales(html_path, duration_ms=duration_ms, sample_fps=sample_fps)
+
+    from PIL import Image
+
+    variants: Dict[Path, AssetVariant] = {}
+    for source, usages in draws.items():
+        if source.suffix.lower() not in RASTER_SUFFIXES or not source.exists():
+            continue
+        with Image.open(source) as img:
+            nat_w, nat_h = img.size
+        scale = max(draw_scale(fit, w, h, nat_w, nat_h) for fit, w, h in usages)
+        variant = make_variant(source, scale=scale, cache_dir=cache_dir, fmt=fmt, quality=quality)
+        if variant is not None:
+            variants[source] = variant
+
+    html = html_path.read_text(encoding="utf-8")
+    (out_html_path or html_path).write_text(
+        rewrite_references(html, html_path.parent.resolve(), variants), encoding="utf-8"
+    )
+    return list(variants.values())
@@ -0,0 +1,268 @@
+"""Audio post-processing for TTS output (NumPy, memory-mapped).
+
+Replaces the ad-hoc ffmpeg passes we used to run on ``renders/<id>.wav``:
+
+- trim leading/trailing silence
+- loudness normalization (LUFS-style, see ``integrated_loudness``) + extra gain
+- pauses between sentences and padding at either end
+
+The PCM is memory-mapped rather than decoded, every step is vectorized, and the
+word timestamps are shifted to match. Results are described by an ``AudioInfo``
+written to ``runs/<id>/audio.json`` so later steps (render) know the duration
+without opening the WAV again.
+
+Requires NumPy: ``pip install -e '.[audio]'``.
+"""
+from __future__ import annotations
+
+import json
+import os
+import struct
+import wave
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from .cartesia_tts import WordTimestamp
+
+if TYPE_CHECKING:
+    import numpy as np
+
+AUDIO_INFO_NAME = "audio.json"
+SENTENCE_END = (".", "!", "?")
+
+
+@dataclass(frozen=True)
+class AudioInfo:
+    sample_rate: int
+    channels: int
+    num_samples: int  # Per channel
+    duration_ms: int
+    wav_bytes: int  # Size of the WAV this describes (cheap staleness check)
+    trim_start_ms: int = 0
+    trim_end_ms: int = 0
+    pauses_ms: int = 0  # Total silence inserted (sentence pauses + padding)
+    loudness_lufs: Optional[float] = None  # Measured before gain
+    gain_db: float = 0.0
+
+
+def write_audio_info(path: Path, info: AudioInfo) -> None:
+    path.write_text(json.dumps(asdict(info), indent=2), encoding="utf-8")
+
+
+def read_audio_info(path: Path, *, wav_path: Optional[Path] = None) -> Optional[AudioInfo]:
+    """Load ``audio.json``; ``None`` if missing or stale for ``wav_path``."""
+    if not path.exists():
+        return None
+    info = AudioInfo(**json.loads(path.read_text(encoding="utf-8")))
+    if wav_path is not None and (not wav_path.exists() or wav_path.stat().st_size != info.wav_bytes):
+        return None
+    return info
+
+
+def _wav_layout(path: Path) -> Tuple[int, int, int, int]:
+    """Walk the RIFF chunks: returns (data_offset, data_bytes, channels, sample_rate)."""
+    with open(path, "rb") as f:
+        riff, _, wave_id = struct.unpack("<4sI4s", f.read(12))
+        if riff != b"RIFF" or wave_id != b"WAVE":
+            raise ValueError(f"Not a WAV file: {path}")
+        channels = sample_rate = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"No data chunk in {path}")
+            chunk_id, size = struct.unpack("<4sI", header)
+            if chunk_id == b"fmt ":
+                fmt = f.read(size)
+                audio_format, channels, sample_rate = struct.unpack("<HHI", fmt[:8])
+                bits = struct.unpack("<H", fmt[14:16])[0]
+                if audio_format != 1 or bits != 16:
+                    raise ValueError(f"Only 16-bit PCM WAV is supported ({path})")
+            elif chunk_id == b"data":
+                if channels is None:
+                    raise ValueError(f"data chunk before fmt chunk in {path}")
+                # Streamed WAVs may carry a placeholder size; clamp to the file
+                size = min(size, os.path.getsize(path) - f.tell())
+                return f.tell(), size, channels, sample_rate
+            else:
+                f.seek(size + (size & 1), os.SEEK_CUR)
+
+
+def read_wav_memmap(path: Path) -> Tuple["np.ndarray", int]:
+    """Memory-map 16-bit PCM as an int16 array of shape (samples, channels)."""
+    import numpy as np
+
+    offset, size, channels, sample_rate = _wav_layout(path)
+    frames = size // (2 * channels)
+    if frames == 0:
+        return np.zeros((0, channels), dtype="<i2"), sample_rate
+    pcm = np.memmap(path, dtype="<i2", mode="r", offset=offset, shape=(frames, channels))
+    return pcm, sample_rate
+
+
+def detect_speech_bounds(
+    pcm: "np.ndarray",
+    sample_rate: int,
+    *,
+    threshold_db: float = -45.0,
+    frame_ms: int = 10,
+) -> Tuple[int, int]:
+    """First and last sample (exclusive) of the region louder than ``threshold_db`` dBFS.
+
+    Works on per-frame peaks so a single click above the threshold counts but the
+    noise floor does not. Returns (0, 0) for an all-silent file.
+    """
+    import numpy as np
+
+    hop = max(1, sample_rate * frame_ms // 1000)
+    n_frames = -(-len(pcm) // hop)
+    if n_frames == 0:
+        return 0, 0
+    peaks = np.abs(pcm.astype(np.int32)).max(axis=1)
+    peaks = np.pad(peaks, (0, n_frames * hop - len(peaks))).reshape(n_frames, hop).max(axis=1)
+    loud = np.flatnonzero(peaks >= 32768.0 * 10 ** (threshold_db / 20))
+    if loud.size == 0:
+        return 0, 0
+    return int(loud[0] * hop), int(min(len(pcm), (loud[-1] + 1) * hop))
+
+
+def integrated_loudness(samples: "np.ndarray", sample_rate: int) -> Optional[float]:
+    """Gated integrated loudness in LUFS (BS.1770 gating, without K-weighting).
+
+    400 ms blocks with 75% overlap, -70 LUFS absolute gate and -10 LU relative gate.
+    Skipping the K-weighting pre-filter keeps this a pure vectorized computation; for
+    speech it lands within ~1 LU of a full meter, which is plenty for levelling
+    voiceovers. ``samples`` is float in [-1, 1], shape (samples, channels).
+    Returns ``None`` when everything is gated out (silence).
+    """
+    import numpy as np
+
+    block = int(0.4 * sample_rate)
+    hop = block // 4
+    if len(samples) < block:
+        block = hop = len(samples)
+    if block == 0:
+        return None
+    # Mean square per block via a cumulative sum (summed over channels, as BS.1770 does)
+    power = np.square(samples, dtype=np.float64).sum(axis=1)
+    csum = np.concatenate(([0.0], np.cumsum(power)))
+    starts = np.arange(0, len(power) - block + 1, hop)
+    ms = (csum[starts + block] - csum[starts]) / block
+
+    with np.errstate(divide="ignore"):
+        block_lufs = -0.691 + 10 * np.log10(ms)
+    gated = ms[block_lufs > -70.0]
+    if gated.size == 0:
+        return None
+    relative_gate = -0.691 + 10 * np.log10(gated.mean()) - 10.0
+    with np.errstate(divide="ignore"):
+        gated = gated[-0.691 + 10 * np.log10(gated) > relative_gate]
+    return float(-0.691 + 10 * np.log10(gated.mean()))
+
+
+def process_wav(
+    wav_path: Path,
+    words: List[WordTimestamp],
+    *,
+    out_wav_path: Optional[Path] = None,
+    trim: bool = True,
+    threshold_db: float = -45.0,
+    margin_ms: int = 50,
+    target_lufs: Optional[float] = -16.0,
+    gain_db: float = 0.0,
+    peak_ceiling_db: float = -1.0,
+    sentence_pause_ms: int = 0,
+    pad_start_ms: int = 0,
+    pad_end_ms: int = 0,
+) -> Tuple[AudioInfo, List[WordTimestamp]]:
+    """Trim, level and pad a 16-bit PCM WAV; return its ``AudioInfo`` and re-aligned words.
+
+    Args:
+        out_wav_path: Where to write the result (default: overwrite ``wav_path``).
+        trim: Cut leading/trailing audio quieter than ``threshold_db`` dBFS, keeping
+            ``margin_ms`` on either side so consonant tails are not clipped.
+        target_lufs: Level the speech to this loudness (``None`` = no normalization).
+        gain_db: Extra gain on top of normalization.
+        peak_ceiling_db: Total gain is reduced if it would push peaks above this.
+        sentence_pause_ms: Silence inserted after every word ending in ``.``, ``!`` or ``?``
+            (except the last one).
+        pad_start_ms / pad_end_ms: Silence added at the very start / end.
+    """
+    import numpy as np
+
+    out_wav_path = out_wav_path or wav_path
+    pcm, rate = read_wav_memmap(wav_path)
+    n = len(pcm)
+    ms_to_samples = rate / 1000.0
+
+    # 1. Trim (only touches the memmap through slicing; nothing is copied yet)
+    start, end = 0, n
+    if trim:
+        lo, hi = detect_speech_bounds(pcm, rate, threshold_db=threshold_db)
+        if hi > lo:
+            margin = int(margin_ms * ms_to_samples)
+            start, end = max(0, lo - margin), min(n, hi + margin)
+    x = pcm[start:end].astype(np.float32) / 32768.0
+    del pcm  # Release the mapping before we possibly overwrite the same file
+
+    # 2. Loudness normalization + gain, capped by the peak ceiling
+    loudness = integrated_loudness(x, rate) if target_lufs is not None else None
+    total_gain_db = gain_db + (target_lufs - loudness if loudness is not None else 0.0)
+    peak = float(np.abs(x).max()) if x.size else 0.0
+    if peak > 0:
+        total_gain_db = min(total_gain_db, peak_ceiling_db - 20 * np.log10(peak))
+    if total_gain_db != 0.0:
+        x *= np.float32(10 ** (total_gain_db / 20))
+
+    # 3. Pauses: split at sentence ends (trimmed coordinates) and interleave silence
+    trim_start_ms = start / ms_to_samples
+    pause = int(sentence_pause_ms * ms_to_samples)
+    cut_ms: List[float] = []
+    if pause > 0:
+        cut_ms = [w.end_ms - trim_start_ms for w in words[:-1] if w.word.rstrip("\"')").endswith(SENTENCE_END)]
+    cuts = np.clip((np.asarray(cut_ms) * ms_to_samples).astype(np.int64), 0, len(x))
+    pad_start = int(pad_start_ms * ms_to_samples)
+    pad_end = int(pad_end_ms * ms_to_samples)
+    channels = x.shape[1]
+    silence = np.zeros((pause, channels), dtype=np.float32)
+    pieces = [np.zeros((pad_start, channels), dtype=np.float32)]
+    for segment in np.split(x, cuts):
+        pieces.extend((segment, silence))
+    pieces[-1] = np.zeros((pad_end, channels), dtype=np.float32)
+    y = np.concatenate(pieces)
+
+    # 4. Write 16-bit PCM (atomically, since we may be replacing the input)
+    out = np.clip(np.rint(y * 32768.0), -32768, 32767).astype("<i2")
+    tmp = out_wav_path.with_suffix(out_wav_path.suffix + ".tmp")
+    with wave.open(str(tmp), "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(out.tobytes())
+    os.replace(tmp, out_wav_path)
+
+    # 5. Re-align word timestamps: shift by the trim, then by every pause before them
+    duration_ms = int(len(out) * 1000 / rate)
+    cut_ends = np.asarray(cut_ms)
+    aligned: List[WordTimestamp] = []
+    for w in words:
+        shift = pad_start_ms - trim_start_ms + sentence_pause_ms * int((cut_ends < w.end_ms - trim_start_ms).sum())
+        aligned.append(WordTimestamp(
+            word=w.word,
+            start_ms=int(min(max(0.0, w.start_ms + shift), duration_ms)),
+            end_ms=int(min(max(0.0, w.end_ms + shift), duration_ms)),
+        ))
+
+    info = AudioInfo(
+        sample_rate=rate,
+        channels=channels,
+        num_samples=len(out),
+        duration_ms=duration_ms,
+        wav_bytes=out_wav_path.stat().st_size,
+        trim_start_ms=int(trim_start_ms),
+        trim_end_ms=int((n - end) * 1000 / rate),
+        pauses_ms=int((pad_start + pad_end + pause * len(cuts)) * 1000 / rate),
+        loudness_lufs=None if loudness is None else round(loudness, 2),
+        gain_db=round(float(total_gain_db), 2),
+    )
+    return info, aligned
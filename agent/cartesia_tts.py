@@ -1,12 +1,20 @@
 from __future__ import annotations
 
+import asyncio
+import base64
 import json
-from dataclasses import dataclass
+import queue
+import threading
+import uuid
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+from urllib.parse import urlencode
 
 import httpx
 
+CARTESIA_VERSION = "2025-04-16"
+
 
 @dataclass
 class WordTimestamp:
@@ -15,6 +23,35 @@ class WordTimestamp:
     end_ms: int
 
 
+@dataclass(frozen=True)
+class StreamEvent:
+    """One message of a streaming synthesis: an audio chunk, a word batch, or the end."""
+
+    context_id: str
+    audio: bytes = b""  # Raw PCM (pcm_s16le, mono)
+    words: List[WordTimestamp] = field(default_factory=list)
+    done: bool = False
+
+
+class CartesiaStreamError(RuntimeError):
+    """The server reported an error for a context, or the connection went away."""
+
+
+def _word_batch(wt: Dict[str, Any]) -> List[WordTimestamp]:
+    """Parallel arrays (words, start, end in seconds) -> WordTimestamps."""
+    words = wt.get("words", [])
+    starts = wt.get("start", [])
+    ends = wt.get("end", [])
+    return [
+        WordTimestamp(
+            word=word,
+            start_ms=int(starts[i] * 1000) if i < len(starts) else 0,
+            end_ms=int(ends[i] * 1000) if i < len(ends) else 0,
+        )
+        for i, word in enumerate(words)
+    ]
+
+
 @dataclass(frozen=True)
 class CartesiaTTS:
     """Cartesia TTS client.
@@ -38,7 +75,7 @@ class CartesiaTTS:
 
         url = f"{self.base_url}/tts/bytes"
         headers = {
-            "Cartesia-Version": "2025-04-16",
+            "Cartesia-Version": CARTESIA_VERSION,
             "X-API-Key": self.api_key,
             "Content-Type": "application/json",
         }
@@ -71,6 +108,8 @@ class CartesiaTTS:
         model: str = "sonic-3",
         sample_rate_hz: int = 44100,
         speed: float = 1.0,
+        on_timestamps: Optional[Callable[[List[WordTimestamp]], None]] = None,
+        on_audio: Optional[Callable[[bytes], None]] = None,
     ) -> List[WordTimestamp]:
         """Synthesize audio and return word-level timestamps.
         
@@ -79,12 +118,15 @@ class CartesiaTTS:
         
         Args:
             speed: Speech speed multiplier (e.g., 1.2 = 20% faster)
+            on_timestamps: Called with each batch of words as it arrives, so callers
+                can start using timing data before the stream ends.
+            on_audio: Called with each decoded PCM chunk as it arrives.
         """
         out_wav_path.parent.mkdir(parents=True, exist_ok=True)
 
         url = f"{self.base_url}/tts/sse"
         headers = {
-            "Cartesia-Version": "2025-04-16",
+            "Cartesia-Version": CARTESIA_VERSION,
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
         }
@@ -120,21 +162,17 @@ class CartesiaTTS:
                     
                     # Audio chunk
                     if "data" in event:
-                        import base64
-                        audio_chunks.append(base64.b64decode(event["data"]))
+                        chunk = base64.b64decode(event["data"])
+                        audio_chunks.append(chunk)
+                        if on_audio:
+                            on_audio(chunk)
                     
                     # Timestamp event (parallel arrays: words, start, end)
                     if "word_timestamps" in event:
-                        wt = event["word_timestamps"]
-                        words = wt.get("words", [])
-                        starts = wt.get("start", [])
-                        ends = wt.get("end", [])
-                        for i, word in enumerate(words):
-                            timestamps.append(WordTimestamp(
-                                word=word,
-                                start_ms=int(starts[i] * 1000) if i < len(starts) else 0,
-                                end_ms=int(ends[i] * 1000) if i < len(ends) else 0,
-                            ))
+                        batch = _word_batch(event["word_timestamps"])
+                        timestamps.extend(batch)
+                        if on_timestamps and batch:
+                            on_timestamps(batch)
 
         # Write WAV file
         audio_data = b"".join(audio_chunks)
@@ -142,6 +180,14 @@ class CartesiaTTS:
 
         return timestamps
 
+    def websocket(self, *, timeout: float = 120.0) -> "CartesiaWebSocket":
+        """Open a WebSocket connection that can run many synthesis contexts."""
+        return CartesiaWebSocket(self, timeout=timeout)
+
+    def websocket_async(self, *, timeout: float = 120.0) -> "AsyncCartesiaWebSocket":
+        """Asyncio variant of ``websocket()``; use with ``async with``."""
+        return AsyncCartesiaWebSocket(self, timeout=timeout)
+
     def _write_wav(self, path: Path, pcm_data: bytes, sample_rate: int) -> None:
         """Write raw PCM data to WAV file."""
         import struct
@@ -172,3 +218,257 @@ class CartesiaTTS:
             f.write(pcm_data)
 
 
+def _ws_url(tts: CartesiaTTS) -> str:
+    base = tts.base_url.replace("https://", "wss://", 1).replace("http://", "ws://", 1)
+    query = urlencode({"api_key": tts.api_key, "cartesia_version": CARTESIA_VERSION})
+    return f"{base}/tts/websocket?{query}"
+
+
+def _ws_request(
+    context_id: str,
+    *,
+    text: str,
+    voice_id: str,
+    model: str,
+    sample_rate_hz: int,
+    speed: float,
+) -> str:
+    return json.dumps({
+        "context_id": context_id,
+        "model_id": model,
+        "transcript": text,
+        "voice": {"mode": "id", "id": voice_id},
+        "output_format": {
+            "container": "raw",
+            "encoding": "pcm_s16le",
+            "sample_rate": sample_rate_hz,
+        },
+        "add_timestamps": True,
+        "continue": False,
+        "generation_config": {"speed": speed, "volume": 1},
+    })
+
+
+def _ws_event(msg: Dict[str, Any]) -> StreamEvent:
+    context_id = msg.get("context_id", "")
+    if msg.get("type") == "error":
+        status = msg.get("status_code")
+        raise CartesiaStreamError(f"Context {context_id}: {msg.get('error', 'error')}" + (f" ({status})" if status else ""))
+    return StreamEvent(
+        context_id=context_id,
+        audio=base64.b64decode(msg["data"]) if msg.get("type") == "chunk" and msg.get("data") else b"",
+        words=_word_batch(msg["word_timestamps"]) if msg.get("type") == "timestamps" else [],
+        done=bool(msg.get("done")),
+    )
+
+
+class CartesiaWebSocket:
+    """Cartesia TTS over one persistent WebSocket.
+
+    Each synthesis runs as its own context on the shared connection; ``stream()``
+    yields audio chunks and word batches as they arrive. Contexts may be consumed
+    concurrently from several threads - a reader thread routes messages by
+    ``context_id``. Requires ``websockets`` (``pip install -e '.[ws]'``)::
+
+        with tts.websocket() as ws:
+            for event in ws.stream(text=script, voice_id=voice):
+                ...
+    """
+
+    def __init__(self, tts: CartesiaTTS, *, timeout: float = 120.0) -> None:
+        from websockets.sync.client import connect
+
+        self.tts = tts
+        self.timeout = timeout
+        # Entered by hand: the connection outlives __init__ and is closed in close()
+        self._ws = connect(_ws_url(tts), open_timeout=timeout, max_size=None).__enter__()
+        self._contexts: Dict[str, "queue.Queue[Optional[Dict[str, Any]]]"] = {}
+        self._lock = threading.Lock()
+        self._error: Optional[BaseException] = None
+        self._reader = threading.Thread(target=self._read_loop, name="cartesia-ws", daemon=True)
+        self._reader.start()
+
+    def _read_loop(self) -> None:
+        try:
+            for raw in self._ws:
+                msg = json.loads(raw)
+                with self._lock:
+                    q = self._contexts.get(msg.get("context_id", ""))
+                if q is not None:
+                    q.put(msg)
+        except Exception as e:
+            self._error = e
+        finally:
+            with self._lock:
+                self._error = self._error or CartesiaStreamError("WebSocket closed")
+                for q in self._contexts.values():
+                    q.put(None)
+
+    def stream(
+        self,
+        *,
+        text: str,
+        voice_id: str,
+        model: str = "sonic-3",
+        sample_rate_hz: int = 44100,
+        speed: float = 1.0,
+        context_id: Optional[str] = None,
+    ) -> Iterator[StreamEvent]:
+        """Start a synthesis context and yield its events until it is done.
+
+        Closing the iterator early cancels the context on the server.
+        """
+        context_id = context_id or uuid.uuid4().hex
+        q: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        with self._lock:
+            if self._error is not None:
+                raise CartesiaStreamError(f"WebSocket closed: {self._error}")
+            self._contexts[context_id] = q
+        done = False
+        try:
+            self._ws.send(_ws_request(context_id, text=text, voice_id=voice_id, model=model,
+                                      sample_rate_hz=sample_rate_hz, speed=speed))
+            while not done:
+                try:
+                    msg = q.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise CartesiaStreamError(f"Context {context_id}: no data for {self.timeout}s") from None
+                if msg is None:
+                    raise CartesiaStreamError(f"Context {context_id}: WebSocket closed mid-stream ({self._error})")
+                event = _ws_event(msg)
+                done = event.done
+                yield event
+        finally:
+            with self._lock:
+                self._contexts.pop(context_id, None)
+            if not done and self._error is None:
+                try:
+                    self._ws.send(json.dumps({"context_id": context_id, "cancel": True}))
+                except Exception:
+                    pass
+
+    def synthesize_with_timestamps(
+        self,
+        *,
+        text: str,
+        voice_id: str,
+        out_wav_path: Path,
+        model: str = "sonic-3",
+        sample_rate_hz: int = 44100,
+        speed: float = 1.0,
+        on_timestamps: Optional[Callable[[List[WordTimestamp]], None]] = None,
+        on_audio: Optional[Callable[[bytes], None]] = None,
+    ) -> List[WordTimestamp]:
+        """Same contract as ``CartesiaTTS.synthesize_with_timestamps``, over this connection."""
+        out_wav_path.parent.mkdir(parents=True, exist_ok=True)
+        audio_chunks: List[bytes] = []
+        timestamps: List[WordTimestamp] = []
+        for event in self.stream(text=text, voice_id=voice_id, model=model,
+                                 sample_rate_hz=sample_rate_hz, speed=speed):
+            if event.audio:
+                audio_chunks.append(event.audio)
+                if on_audio:
+                    on_audio(event.audio)
+            if event.words:
+                timestamps.extend(event.words)
+                if on_timestamps:
+                    on_timestamps(event.words)
+        self.tts._write_wav(out_wav_path, b"".join(audio_chunks), sample_rate_hz)
+        return timestamps
+
+    def close(self) -> None:
+        self._ws.close()
+        self._reader.join()
+
+    def __enter__(self) -> "CartesiaWebSocket":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class AsyncCartesiaWebSocket:
+    """Asyncio counterpart of ``CartesiaWebSocket``::
+
+        async with tts.websocket_async() as ws:
+            async for event in ws.stream(text=script, voice_id=voice):
+                ...
+    """
+
+    def __init__(self, tts: CartesiaTTS, *, timeout: float = 120.0) -> None:
+        self.tts = tts
+        self.timeout = timeout
+        self._ws: Any = None
+        self._reader: Optional[asyncio.Task] = None
+        self._contexts: Dict[str, "asyncio.Queue[Optional[Dict[str, Any]]]"] = {}
+        self._error: Optional[BaseException] = None
+
+    async def __aenter__(self) -> "AsyncCartesiaWebSocket":
+        from websockets.asyncio.client import connect
+
+        self._ws = await connect(_ws_url(self.tts), open_timeout=self.timeout, max_size=None)
+        self._reader = asyncio.create_task(self._read_loop())
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
+
+    async def _read_loop(self) -> None:
+        try:
+            async for raw in self._ws:
+                msg = json.loads(raw)
+                q = self._contexts.get(msg.get("context_id", ""))
+                if q is not None:
+                    q.put_nowait(msg)
+        except Exception as e:
+            self._error = e
+        finally:
+            self._error = self._error or CartesiaStreamError("WebSocket closed")
+            for q in self._contexts.values():
+                q.put_nowait(None)
+
+    async def stream(
+        self,
+        *,
+        text: str,
+        voice_id: str,
+        model: str = "sonic-3",
+        sample_rate_hz: int = 44100,
+        speed: float = 1.0,
+        context_id: Optional[str] = None,
+    ) -> AsyncIterator[StreamEvent]:
+        """Start a synthesis context and yield its events until it is done."""
+        if self._ws is None:
+            raise RuntimeError("Use 'async with tts.websocket_async() as ws'")
+        if self._error is not None:
+            raise CartesiaStreamError(f"WebSocket closed: {self._error}")
+        context_id = context_id or uuid.uuid4().hex
+        q: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue()
+        self._contexts[context_id] = q
+        done = False
+        try:
+            await self._ws.send(_ws_request(context_id, text=text, voice_id=voice_id, model=model,
+                                            sample_rate_hz=sample_rate_hz, speed=speed))
+            while not done:
+                try:
+                    msg = await asyncio.wait_for(q.get(), self.timeout)
+                except asyncio.TimeoutError:
+                    raise CartesiaStreamError(f"Context {context_id}: no data for {self.timeout}s") from None
+                if msg is None:
+                    raise CartesiaStreamError(f"Context {context_id}: WebSocket closed mid-stream ({self._error})")
+                event = _ws_event(msg)
+                done = event.done
+                yield event
+        finally:
+            self._contexts.pop(context_id, None)
+            if not done and self._error is None:
+                try:
+                    await self._ws.send(json.dumps({"context_id": context_id, "cancel": True}))
+                except Exception:
+                    pass
+
+    async def close(self) -> None:
+        if self._ws is not None:
+            await self._ws.close()
+        if self._reader is not None:
+            await self._reader
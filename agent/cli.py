@@ -5,10 +5,13 @@ import argparse
 import json
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
-from .cartesia_tts import CartesiaTTS
+from .cartesia_tts import CartesiaTTS, WordTimestamp
 from .debug_overlay import inject_debug_overlay
 from .renderer import render_mp4
 
@@ -25,8 +28,11 @@ def get_shorts_dir() -> Path:
     return Path(__file__).resolve().parent.parent
 
 
-def cmd_tts(args) -> int:
-    """Generate TTS audio + word-level timestamps."""
+def cmd_tts(args, on_timestamps=None) -> int:
+    """Generate TTS audio + word-level timestamps.
+    
+    ``on_timestamps`` receives word batches while the TTS response is still streaming.
+    """
     
     shorts_dir = get_shorts_dir()
     runs_dir = shorts_dir / "runs" / args.id
@@ -45,6 +51,9 @@ def cmd_tts(args) -> int:
     # Save audio script to run dir
     (runs_dir / "audio_script.md").write_text(audio_script, encoding="utf-8")
     
+    # New audio makes any previous post-processing metadata stale
+    (runs_dir / "audio.json").unlink(missing_ok=True)
+    
     # Get API key
     cartesia_key = get_cartesia_api_key()
     if not cartesia_key:
@@ -57,12 +66,15 @@ def cmd_tts(args) -> int:
         tts = CartesiaTTS(api_key=cartesia_key)
         wav_path = renders_dir / f"{args.id}.wav"
         
-        word_timestamps = tts.synthesize_with_timestamps(
-            text=audio_script,
-            voice_id=CARTESIA_VOICE_ID,
-            out_wav_path=wav_path,
-            speed=args.speed,
-        )
+        client = tts.websocket() if getattr(args, "websocket", False) else nullcontext(tts)
+        with client as synth:
+            word_timestamps = synth.synthesize_with_timestamps(
+                text=audio_script,
+                voice_id=CARTESIA_VOICE_ID,
+                out_wav_path=wav_path,
+                speed=args.speed,
+                on_timestamps=on_timestamps,
+            )
         
         print(f"  -> Saved WAV to {wav_path}")
         
@@ -79,13 +91,100 @@ def cmd_tts(args) -> int:
         print(f"ERROR: TTS failed: {e}", file=sys.stderr)
         return 1
     
+    if args.postprocess:
+        result = _postprocess_audio(args, runs_dir, wav_path)
+        if result != 0:
+            return result
+    
     print(f"\n✓ TTS complete! Outputs in {runs_dir}")
     return 0
 
 
+def _postprocess_audio(args, runs_dir: Path, wav_path: Path) -> int:
+    """Trim/normalize/pad the WAV in place and re-align tts_words.json."""
+    from .audio import AUDIO_INFO_NAME, process_wav, write_audio_info
+    
+    tts_words_path = runs_dir / "tts_words.json"
+    words = []
+    if tts_words_path.exists():
+        words = [WordTimestamp(**w) for w in json.loads(tts_words_path.read_text(encoding="utf-8"))]
+    
+    print(f"Post-processing {wav_path}...")
+    try:
+        info, words = process_wav(
+            wav_path,
+            words,
+            trim=args.trim,
+            target_lufs=None if args.no_normalize else args.target_lufs,
+            gain_db=args.gain_db,
+            sentence_pause_ms=args.sentence_pause_ms,
+            pad_start_ms=args.pad_start_ms,
+            pad_end_ms=args.pad_end_ms,
+        )
+    except ImportError:
+        print("ERROR: Audio post-processing needs NumPy: pip install -e '.[audio]'", file=sys.stderr)
+        return 1
+    except Exception as e:
+        print(f"ERROR: Audio post-processing failed: {e}", file=sys.stderr)
+        return 1
+    
+    if tts_words_path.exists():
+        tts_words_path.write_text(json.dumps([w.__dict__ for w in words], indent=2), encoding="utf-8")
+    write_audio_info(runs_dir / AUDIO_INFO_NAME, info)
+    print(f"  -> Trimmed {info.trim_start_ms}ms / {info.trim_end_ms}ms, added {info.pauses_ms}ms of pauses")
+    print(f"  -> Loudness {info.loudness_lufs} LUFS, gain {info.gain_db:+.1f} dB, duration: {info.duration_ms}ms")
+    return 0
+
+
+def cmd_audio(args) -> int:
+    """Post-process an existing TTS WAV (trim, normalize, pauses)."""
+    
+    shorts_dir = get_shorts_dir()
+    runs_dir = shorts_dir / "runs" / args.id
+    wav_path = shorts_dir / "renders" / f"{args.id}.wav"
+    if not wav_path.exists():
+        print(f"ERROR: {wav_path} not found", file=sys.stderr)
+        return 1
+    runs_dir.mkdir(parents=True, exist_ok=True)
+    
+    result = _postprocess_audio(args, runs_dir, wav_path)
+    if result == 0:
+        print(f"\n✓ Audio post-processing complete!")
+    return result
+
+
 def cmd_render(args) -> int:
     """Render MP4 from scene.html + WAV."""
     
+    prepared = _prepare_render(args)
+    if prepared is None:
+        return 1
+    runs_dir, scene_html, duration_ms, wav_path = prepared
+    
+    return _render_scene(
+        args,
+        runs_dir=runs_dir,
+        scene_html=scene_html,
+        duration_ms=duration_ms,
+        wav_path=wav_path,
+        resume=getattr(args, "resume", False),
+        **_browser_cache_kwargs(args),
+    )
+
+
+def _browser_cache_kwargs(args) -> dict:
+    """``--no-browser-cache``: load the scene from file:// in a throwaway profile."""
+    if getattr(args, "no_browser_cache", False):
+        return {"serve": False, "cache_dir": None}
+    return {}
+
+
+def _prepare_render(args):
+    """Load scene.html (+ debug overlay), find the WAV and settle the duration.
+    
+    Returns ``(runs_dir, scene_html, duration_ms, wav_path)``, or None on error.
+    """
+    
     shorts_dir = get_shorts_dir()
     runs_dir = shorts_dir / "runs" / args.id
     renders_dir = shorts_dir / "renders"
@@ -95,7 +194,7 @@ def cmd_render(args) -> int:
     if not scene_path.exists():
         print(f"ERROR: {scene_path} not found", file=sys.stderr)
         print("Create scene.html manually in the run directory first.", file=sys.stderr)
-        return 1
+        return None
     
     # Check for WAV
     wav_path = renders_dir / f"{args.id}.wav"
@@ -111,44 +210,60 @@ def cmd_render(args) -> int:
         tts_words_path = runs_dir / "tts_words.json"
         if tts_words_path.exists():
             tts_words = json.loads(tts_words_path.read_text(encoding="utf-8"))
-            # Convert word timestamps to segments for display
-            voiceover_segments = []
-            for w in tts_words:
-                voiceover_segments.append({
-                    "start_ms": w["start_ms"],
-                    "end_ms": w["end_ms"],
-                    "text": w["word"],
-                })
-            scene_html = inject_debug_overlay(scene_html, voiceover_segments)
+            scene_html = inject_debug_overlay(scene_html, _voiceover_segments(tts_words))
             print("  -> Injected debug overlay")
         else:
             print("WARNING: No tts_words.json found, skipping debug overlay")
     
-    # Write modified scene.html for rendering
-    render_scene_path = runs_dir / "scene_render.html"
-    render_scene_path.write_text(scene_html, encoding="utf-8")
-    
     # Determine duration
     duration_ms = args.duration * 1000
     if wav_path:
-        # Get actual duration from WAV
-        import wave
-        with wave.open(str(wav_path), 'rb') as w:
-            frames = w.getnframes()
-            rate = w.getframerate()
-            wav_duration_ms = int((frames / rate) * 1000)
-            duration_ms = max(duration_ms, wav_duration_ms)
+        duration_ms = max(duration_ms, _wav_duration_ms(runs_dir, wav_path))
     
     print(f"Rendering MP4 from {scene_path}...")
     print(f"  Duration: {duration_ms}ms, FPS: {args.fps}")
+    return runs_dir, scene_html, duration_ms, wav_path
+
+
+def _voiceover_segments(tts_words) -> list:
+    """Convert word timestamps (dicts from tts_words.json) to debug overlay segments."""
+    return [{"start_ms": w["start_ms"], "end_ms": w["end_ms"], "text": w["word"]} for w in tts_words]
+
+
+def _wav_duration_ms(runs_dir: Path, wav_path: Path) -> int:
+    # Prefer the duration recorded by audio post-processing (no need to re-open the WAV)
+    from .audio import AUDIO_INFO_NAME, read_audio_info
+    audio_info = read_audio_info(runs_dir / AUDIO_INFO_NAME, wav_path=wav_path)
+    if audio_info:
+        return audio_info.duration_ms
+    # Get actual duration from WAV
+    import wave
+    with wave.open(str(wav_path), 'rb') as w:
+        frames = w.getnframes()
+        rate = w.getframerate()
+        return int((frames / rate) * 1000)
+
+
+def _render_scene(args, *, runs_dir: Path, scene_html: str, duration_ms: int, wav_path: Optional[Path], **render_kwargs) -> int:
+    """Write scene_render.html, render it and copy the MP4 to renders/."""
+    
+    renders_dir = get_shorts_dir() / "renders"
+    
+    # Write modified scene.html for rendering
+    render_scene_path = runs_dir / "scene_render.html"
+    render_scene_path.write_text(scene_html, encoding="utf-8")
     
     try:
+        if getattr(args, "optimize_assets", False):
+            _optimize_assets(render_scene_path, duration_ms=duration_ms)
+        
         result = render_mp4(
             html_path=render_scene_path,
             output_dir=runs_dir,
             duration_ms=duration_ms,
             fps=args.fps,
             wav_path=wav_path,
+            **render_kwargs,
         )
         
         # Copy final MP4 to renders/
@@ -166,26 +281,372 @@ def cmd_render(args) -> int:
     return 0
 
 
-def cmd_run(args) -> int:
-    """Full pipeline: TTS + Render (scene.html must exist)."""
+def _optimize_assets(html_path: Path, *, duration_ms: int, out_html_path: Optional[Path] = None,
+                     fmt: str = "webp", quality: int = 90) -> None:
+    from .assets import optimize_scene_assets
+    
+    variants = optimize_scene_assets(
+        html_path,
+        cache_dir=get_shorts_dir() / ".cache" / "assets",
+        duration_ms=duration_ms,
+        out_html_path=out_html_path,
+        fmt=fmt,
+        quality=quality,
+    )
+    for v in variants:
+        print(f"  -> {v.source.name}: {v.source_width}x{v.source_height} ({v.source_bytes // 1024} KB)"
+              f" -> {v.width}x{v.height} {v.path.suffix[1:]} ({v.bytes // 1024} KB)")
+    print(f"  -> Optimized {len(variants)} image(s)")
+
+
+def cmd_assets_optimize(args) -> int:
+    """Right-size and re-encode the images a scene uses; write scene_optimized.html."""
     
     shorts_dir = get_shorts_dir()
     runs_dir = shorts_dir / "runs" / args.id
+    scene_path = runs_dir / "scene.html"
+    if not scene_path.exists():
+        print(f"ERROR: {scene_path} not found", file=sys.stderr)
+        return 1
+    
+    duration_ms = args.duration * 1000
+    wav_path = shorts_dir / "renders" / f"{args.id}.wav"
+    if wav_path.exists():
+        duration_ms = max(duration_ms, _wav_duration_ms(runs_dir, wav_path))
+    
+    out_path = runs_dir / "scene_optimized.html"
+    print(f"Optimizing images in {scene_path}...")
+    try:
+        _optimize_assets(scene_path, duration_ms=duration_ms, out_html_path=out_path,
+                         fmt=args.format, quality=args.quality)
+    except ImportError as e:
+        print(f"ERROR: Asset optimization needs Pillow + Playwright ({e}): pip install -e '.[assets,dev]'", file=sys.stderr)
+        return 1
+    except Exception as e:
+        print(f"ERROR: Asset optimization failed: {e}", file=sys.stderr)
+        return 1
+    
+    print(f"\n✓ Wrote {out_path}")
+    return 0
+
+
+def cmd_profile_scene(args) -> int:
+    """Profile where render time goes in a scene (elements, CSS, timers, frames)."""
+    
+    shorts_dir = get_shorts_dir()
+    runs_dir = shorts_dir / "runs" / args.id
+    scene_path = runs_dir / "scene.html"
+    if not scene_path.exists():
+        print(f"ERROR: {scene_path} not found", file=sys.stderr)
+        return 1
+    
+    if args.duration is not None:
+        duration_ms = args.duration * 1000
+    else:
+        wav_path = shorts_dir / "renders" / f"{args.id}.wav"
+        duration_ms = _wav_duration_ms(runs_dir, wav_path) if wav_path.exists() else 10_000
+    
+    out_dir = runs_dir / "profile"
+    print(f"Profiling {scene_path}...")
+    print(f"  Duration: {duration_ms}ms, FPS: {args.fps}")
+    try:
+        from .profiler import profile_scene
+        report = profile_scene(html_path=scene_path, out_dir=out_dir, duration_ms=duration_ms, fps=args.fps)
+    except Exception as e:
+        print(f"ERROR: Profiling failed: {e}", file=sys.stderr)
+        return 1
+    
+    t = report.totals
+    print(f"\nTotal {t['total']:.0f}ms over {report.frames} frames: "
+          + ", ".join(f"{c} {t[c]:.0f}ms" for c in ("script", "style", "layout", "paint", "raster", "composite")))
+    
+    def _table(title: str, rows: list, key: str) -> None:
+        print(f"\n{title}")
+        for row in rows[:args.top]:
+            c = row["cost"]
+            print(f"  {c['total']:9.1f}ms  (paint {c['paint']:.0f} / raster {c['raster']:.0f} / "
+                  f"layout {c['layout']:.0f} / style {c['style']:.0f} / script {c['script']:.0f})  {row[key]}")
+    
+    _table("Top elements", report.elements, "selector")
+    _table("Top CSS properties (cost of elements using them)", report.css_properties, "property")
+    _table("Top timers", report.timers, "label")
+    
+    slowest = sorted(report.timeline, key=lambda r: r.get("wall_ms", r["total"]), reverse=True)[:args.top]
+    print("\nSlowest frames")
+    for row in slowest:
+        print(f"  frame {row['frame']:5d} @ {row['t_ms'] / 1000:6.2f}s  {row.get('wall_ms', row['total']):7.1f}ms")
+    
+    print(f"\n✓ Report: {out_dir / 'report.json'}, timeline: {out_dir / 'timeline.csv'}, trace: {out_dir / 'trace.json'}")
+    return 0
+
+
+def _fake_cartesia_config(args):
+    from .fake_cartesia import FakeCartesiaConfig
+    return FakeCartesiaConfig(
+        first_chunk_latency_ms=args.latency_ms,
+        chunk_ms=args.chunk_ms,
+        chunk_interval_ms=args.chunk_interval_ms,
+        jitter_ms=args.jitter_ms,
+        ms_per_char=args.ms_per_char,
+        word_gap_ms=args.word_gap_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        drop_rate=args.drop_rate,
+        seed=args.seed,
+    )
+
+
+def cmd_fake_cartesia(args) -> int:
+    """Serve the local Cartesia stand-in until interrupted."""
+    import time
+    from .fake_cartesia import FakeCartesiaServer
+    
+    with FakeCartesiaServer(_fake_cartesia_config(args), host=args.host, port=args.port, verbose=True) as server:
+        print(f"Fake Cartesia listening on {server.base_url} (Ctrl+C to stop)", flush=True)
+        print(f"  Use: CartesiaTTS(api_key='test', base_url='{server.base_url}')")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+def cmd_tts_loadtest(args) -> int:
+    """Measure TTS client latency/throughput/memory under concurrency."""
+    from .fake_cartesia import FakeCartesiaProcess
+    from .loadtest import run_tts_load_test
+    
+    text = Path(args.text_file).read_text(encoding="utf-8") if args.text_file else (
+        "Let's say you're working at a bank and your managing director asks for a DCF by tomorrow morning. "
+        * 4
+    )
+    
+    # Out of process, so the stand-in does not compete with the measured client for the GIL
+    server_cm = nullcontext(None) if args.base_url else FakeCartesiaProcess(_fake_cartesia_config(args))
+    with server_cm as server:
+        base_url = args.base_url or server.base_url
+        api_key = get_cartesia_api_key() if args.base_url else "test"
+        if not api_key:
+            print("ERROR: CARTESIA_API_KEY not set", file=sys.stderr)
+            return 1
+        transport = "WebSocket" if args.websocket else "SSE"
+        print(f"Load testing {base_url} ({transport}): {args.requests} requests, concurrency {args.concurrency}...")
+        result = run_tts_load_test(
+            CartesiaTTS(api_key=api_key, base_url=base_url),
+            text=text,
+            voice_id=CARTESIA_VOICE_ID,
+            requests=args.requests,
+            concurrency=args.concurrency,
+            websocket=args.websocket,
+        )
     
-    # First, run TTS
-    tts_result = cmd_tts(args)
-    if tts_result != 0:
-        return tts_result
+    summary = result.summary()
+    print(json.dumps(summary, indent=2))
+    errors = sorted({r.error for r in result.requests if r.error})
+    for error in errors[:5]:
+        print(f"  error: {error}")
+    return 0 if summary["errors"] == 0 or args.allow_errors else 1
+
+
+def cmd_dist_render(args) -> int:
+    """Split a render into segments on a shared queue, wait for workers, join the result."""
+    import uuid
+    from .distributed import RenderJob, WorkQueue, join_segments, wait_for_job
+    
+    prepared = _prepare_render(args)
+    if prepared is None:
+        return 1
+    runs_dir, scene_html, duration_ms, wav_path = prepared
+    
+    render_scene_path = (runs_dir / "scene_render.html").resolve()
+    render_scene_path.write_text(scene_html, encoding="utf-8")
     
-    # Check if scene.html exists
+    queue = WorkQueue(Path(args.queue).resolve(), stale_after_s=args.stale_after)
+    job = RenderJob(
+        job_id=f"{args.id}-{uuid.uuid4().hex[:8]}",
+        html_path=str(render_scene_path),
+        duration_ms=duration_ms,
+        fps=args.fps,
+    )
+    try:
+        if getattr(args, "optimize_assets", False):
+            _optimize_assets(render_scene_path, duration_ms=duration_ms)
+        
+        tasks = queue.submit(job, segment_frames=max(1, args.segment_seconds * args.fps))
+        print(f"  -> Queued job {job.job_id}: {len(tasks)} segments of {args.segment_seconds}s in {queue.root}")
+        print(f"  -> Start workers with: shorts dist worker --queue {queue.root}")
+        wait_for_job(queue, job.job_id)
+        
+        result = join_segments(queue, job.job_id, output_dir=runs_dir, wav_path=wav_path)
+        final_mp4 = result.final_mp4_path or result.mp4_path
+        output_mp4 = get_shorts_dir() / "renders" / f"{args.id}.mp4"
+        output_mp4.write_bytes(final_mp4.read_bytes())
+        print(f"  -> Saved MP4 to {output_mp4}")
+        print(f"  -> Joined {len(tasks)} segments ({result.frame_count} frames)")
+        queue.remove(job.job_id)
+    except KeyboardInterrupt:
+        # Nobody would join the segments: stop workers from rendering them
+        queue.cancel(job.job_id)
+        print(f"\nStopped; cancelled job {job.job_id} in {queue.root}", file=sys.stderr)
+        return 1
+    except Exception as e:
+        queue.cancel(job.job_id)
+        print(f"ERROR: Distributed render failed: {e}", file=sys.stderr)
+        return 1
+    
+    print(f"\n✓ Render complete!")
+    return 0
+
+
+def cmd_dist_worker(args) -> int:
+    """Claim and render segments from a shared queue."""
+    from .distributed import WorkQueue, run_worker
+    
+    queue = WorkQueue(Path(args.queue).resolve(), stale_after_s=args.stale_after)
+    print(f"Worker polling {queue.root}...")
+    try:
+        rendered = run_worker(
+            queue,
+            worker_id=args.worker_id,
+            heartbeat_s=args.heartbeat,
+            exit_when_idle=args.exit_when_idle,
+            **({"cache_dir": Path(args.cache_dir)} if args.cache_dir else {}),
+        )
+    except KeyboardInterrupt:
+        # The claim (if any) goes stale and is reassigned after --stale-after seconds
+        return 0
+    print(f"\n✓ Rendered {rendered} segment(s)")
+    return 0
+
+
+class _TTSProgress:
+    """Word timestamps streamed by the TTS thread, shared with the render thread."""
+    
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self.words: List[WordTimestamp] = []
+        self.heard_ms = 0  # Audio time covered by the words received so far
+        self.done = False
+    
+    def add(self, batch: List[WordTimestamp]) -> None:
+        with self._cond:
+            self.words.extend(batch)
+            self.heard_ms = max(self.heard_ms, max(w.end_ms for w in batch))
+            self._cond.notify_all()
+    
+    def finish(self, _future=None) -> None:
+        with self._cond:
+            self.done = True
+            self._cond.notify_all()
+    
+    def wait(self, t_ms: Optional[float] = None) -> None:
+        """Block until words reach ``t_ms`` (or until TTS is done if ``t_ms`` is None)."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.done or (t_ms is not None and self.heard_ms > t_ms))
+
+
+def cmd_run(args) -> int:
+    """Full pipeline: TTS + Render (scene.html must exist).
+    
+    TTS runs in a background thread while the renderer launches Chromium, loads the
+    scene and captures the first ``--duration`` seconds of frames. With the debug
+    overlay on, each frame waits until the streamed timestamps cover its time.
+    Once audio is written, capture extends to the audio length and muxing follows.
+    """
+    
+    shorts_dir = get_shorts_dir()
+    runs_dir = shorts_dir / "runs" / args.id
+    wav_path = shorts_dir / "renders" / f"{args.id}.wav"
+    
+    # Without a scene there is nothing to overlap: just run TTS
     scene_path = runs_dir / "scene.html"
     if not scene_path.exists():
+        tts_result = cmd_tts(args)
+        if tts_result != 0:
+            return tts_result
         print(f"\nWARNING: {scene_path} not found")
         print("Create scene.html manually, then run: shorts render --id " + args.id)
         return 0
     
-    # Run render
-    return cmd_render(args)
+    scene_html = scene_path.read_text(encoding="utf-8")
+    if args.debug:
+        # Segments are pushed into the page as they stream in (see before_frame)
+        scene_html = inject_debug_overlay(scene_html, [])
+    
+    progress = _TTSProgress()
+    pushed = [0]  # Words already sent to the page
+    
+    def before_frame(page, i: int, t_ms: float) -> None:
+        if tts_future.done() and tts_future.result() != 0:
+            raise RuntimeError("TTS failed")
+        if not args.debug:
+            return
+        # Post-processing rewrites the timestamps, so only the final ones are usable
+        progress.wait(None if args.postprocess else t_ms)
+        if progress.done:
+            words_path = runs_dir / "tts_words.json"
+            if pushed[0] == -1 or not words_path.exists():
+                return
+            segments = _voiceover_segments(json.loads(words_path.read_text(encoding="utf-8")))
+            pushed[0] = -1
+        elif len(progress.words) > pushed[0]:
+            segments = _voiceover_segments([w.__dict__ for w in progress.words])
+            pushed[0] = len(progress.words)
+        else:
+            return
+        page.evaluate("(segs) => window.__shortsSetVoiceover(segs)", segments)
+    
+    def extend_duration_ms() -> int:
+        progress.wait()
+        if tts_future.result() != 0:
+            raise RuntimeError("TTS failed")
+        return _wav_duration_ms(runs_dir, wav_path)
+    
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        tts_future = pool.submit(cmd_tts, args, on_timestamps=progress.add)
+        tts_future.add_done_callback(progress.finish)
+        
+        print(f"Rendering MP4 from {scene_path} while TTS runs...")
+        print(f"  Duration: >= {args.duration * 1000}ms, FPS: {args.fps}")
+        render_result = _render_scene(
+            args,
+            runs_dir=runs_dir,
+            scene_html=scene_html,
+            duration_ms=args.duration * 1000,
+            wav_path=wav_path,
+            before_frame=before_frame,
+            extend_duration_ms=extend_duration_ms,
+            **_browser_cache_kwargs(args),
+        )
+        tts_result = tts_future.result()
+    
+    return tts_result or render_result
+
+
+def _add_audio_args(parser: argparse.ArgumentParser) -> None:
+    """Audio post-processing options (shared by tts, run and audio)."""
+    parser.add_argument("--no-trim", dest="trim", action="store_false", help="Keep leading/trailing silence")
+    parser.add_argument("--target-lufs", type=float, default=-16.0, help="Loudness target (default: -16)")
+    parser.add_argument("--no-normalize", action="store_true", help="Skip loudness normalization")
+    parser.add_argument("--gain-db", type=float, default=0.0, help="Extra gain in dB (default: 0)")
+    parser.add_argument("--sentence-pause-ms", type=int, default=0, help="Silence added after each sentence (default: 0)")
+    parser.add_argument("--pad-start-ms", type=int, default=0, help="Silence added at the start (default: 0)")
+    parser.add_argument("--pad-end-ms", type=int, default=0, help="Silence added at the end (default: 0)")
+
+
+def _add_fake_cartesia_args(parser: argparse.ArgumentParser) -> None:
+    """Behaviour of the local Cartesia stand-in (shared by fake-cartesia and tts-loadtest)."""
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="Delay before the first chunk (default: 150)")
+    parser.add_argument("--chunk-ms", type=int, default=100, help="Audio per SSE chunk in ms (default: 100)")
+    parser.add_argument("--chunk-interval-ms", type=float, default=20.0, help="Delay between chunks (default: 20)")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Random +/- jitter on every delay (default: 0)")
+    parser.add_argument("--ms-per-char", type=float, default=55.0, help="Speaking rate at speed 1.0 (default: 55)")
+    parser.add_argument("--word-gap-ms", type=float, default=40.0, help="Silence between words (default: 40)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail (default: 0)")
+    parser.add_argument("--error-status", type=int, default=500, help="HTTP status for injected failures (default: 500)")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="Fraction of streams cut off mid-way (default: 0)")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for jitter/failures")
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -200,8 +661,17 @@ def build_parser() -> argparse.ArgumentParser:
     tts_parser.add_argument("--id", required=True, help="Unique ID for this run")
     tts_parser.add_argument("--audio", required=True, help="Path to audio script markdown file")
     tts_parser.add_argument("--speed", type=float, default=1.0, help="Speech speed (e.g., 1.2 = 20%% faster)")
+    tts_parser.add_argument("--websocket", action="store_true", help="Stream TTS over a WebSocket instead of SSE (needs websockets)")
+    tts_parser.add_argument("--postprocess", action="store_true", help="Trim/normalize the WAV after synthesis (needs NumPy)")
+    _add_audio_args(tts_parser)
     tts_parser.set_defaults(func=cmd_tts)
     
+    # Audio subcommand (post-process an existing WAV)
+    audio_parser = subparsers.add_parser("audio", help="Trim, normalize and pad TTS audio (re-aligns timestamps)")
+    audio_parser.add_argument("--id", required=True, help="Run ID whose WAV to process")
+    _add_audio_args(audio_parser)
+    audio_parser.set_defaults(func=cmd_audio)
+    
     # Render subcommand
     render_parser = subparsers.add_parser("render", help="Render MP4 from scene.html + WAV")
     render_parser.add_argument("--id", required=True, help="Run ID to render")
@@ -209,6 +679,9 @@ def build_parser() -> argparse.ArgumentParser:
     render_parser.add_argument("--fps", type=int, default=30, help="Render FPS (default: 30)")
     render_parser.add_argument("--debug", action="store_true", default=True, help="Add debug overlay (default: on)")
     render_parser.add_argument("--no-debug", dest="debug", action="store_false", help="Disable debug overlay")
+    render_parser.add_argument("--resume", action="store_true", help="Resume an interrupted render from its manifest")
+    render_parser.add_argument("--optimize-assets", action="store_true", help="Right-size scene images before rendering")
+    render_parser.add_argument("--no-browser-cache", action="store_true", help="Load the scene from file:// in a fresh browser profile")
     render_parser.set_defaults(func=cmd_render)
     
     # Run subcommand (TTS + Render)
@@ -216,12 +689,76 @@ def build_parser() -> argparse.ArgumentParser:
     run_parser.add_argument("--id", required=True, help="Unique ID for this run")
     run_parser.add_argument("--audio", required=True, help="Path to audio script markdown file")
     run_parser.add_argument("--speed", type=float, default=1.0, help="Speech speed (e.g., 1.2 = 20%% faster)")
+    run_parser.add_argument("--websocket", action="store_true", help="Stream TTS over a WebSocket instead of SSE (needs websockets)")
+    run_parser.add_argument("--postprocess", action="store_true", help="Trim/normalize the WAV after synthesis (needs NumPy)")
+    _add_audio_args(run_parser)
     run_parser.add_argument("--duration", type=int, default=60, help="Min duration in seconds (default: 60)")
     run_parser.add_argument("--fps", type=int, default=30, help="Render FPS (default: 30)")
     run_parser.add_argument("--debug", action="store_true", default=True, help="Add debug overlay (default: on)")
     run_parser.add_argument("--no-debug", dest="debug", action="store_false", help="Disable debug overlay")
+    run_parser.add_argument("--optimize-assets", action="store_true", help="Right-size scene images before rendering")
+    run_parser.add_argument("--no-browser-cache", action="store_true", help="Load the scene from file:// in a fresh browser profile")
     run_parser.set_defaults(func=cmd_run)
     
+    # Profile subcommand
+    profile_parser = subparsers.add_parser("profile-scene", help="Rank the elements, CSS and timers that make a scene slow to render")
+    profile_parser.add_argument("--id", required=True, help="Run ID whose scene.html to profile")
+    profile_parser.add_argument("--duration", type=int, default=None, help="Seconds to profile (default: audio length, else 10)")
+    profile_parser.add_argument("--fps", type=int, default=30, help="Frames per second (default: 30)")
+    profile_parser.add_argument("--top", type=int, default=10, help="Rows per ranking (default: 10)")
+    profile_parser.set_defaults(func=cmd_profile_scene)
+    
+    # Local Cartesia stand-in + TTS load test
+    fake_parser = subparsers.add_parser("fake-cartesia", help="Run a local stand-in for the Cartesia TTS API")
+    fake_parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    fake_parser.add_argument("--port", type=int, default=8787, help="Port (default: 8787)")
+    _add_fake_cartesia_args(fake_parser)
+    fake_parser.set_defaults(func=cmd_fake_cartesia)
+    
+    loadtest_parser = subparsers.add_parser("tts-loadtest", help="Measure TTS client latency and throughput under concurrency")
+    loadtest_parser.add_argument("--requests", type=int, default=20, help="Total requests (default: 20)")
+    loadtest_parser.add_argument("--concurrency", type=int, default=4, help="Requests in flight (default: 4)")
+    loadtest_parser.add_argument("--text-file", help="Transcript to synthesize (default: built-in paragraph)")
+    loadtest_parser.add_argument("--base-url", help="Test a running server instead of the bundled stand-in (uses CARTESIA_API_KEY)")
+    loadtest_parser.add_argument("--websocket", action="store_true", help="Run all requests as contexts on one WebSocket instead of SSE requests")
+    loadtest_parser.add_argument("--allow-errors", action="store_true", help="Exit 0 even if requests failed")
+    _add_fake_cartesia_args(loadtest_parser)
+    loadtest_parser.set_defaults(func=cmd_tts_loadtest)
+    
+    # Distributed rendering over a shared directory
+    dist_parser = subparsers.add_parser("dist", help="Render across machines via a shared-directory work queue")
+    dist_sub = dist_parser.add_subparsers(dest="dist_command", required=True)
+    dist_render_parser = dist_sub.add_parser("render", help="Queue a render as segments, wait for workers, join the MP4")
+    dist_render_parser.add_argument("--id", required=True, help="Run ID to render")
+    dist_render_parser.add_argument("--queue", required=True, help="Queue directory on storage shared by all workers")
+    dist_render_parser.add_argument("--segment-seconds", type=int, default=5, help="Seconds of video per task (default: 5)")
+    dist_render_parser.add_argument("--duration", type=int, default=60, help="Min duration in seconds (default: 60)")
+    dist_render_parser.add_argument("--fps", type=int, default=30, help="Render FPS (default: 30)")
+    dist_render_parser.add_argument("--debug", action="store_true", default=True, help="Add debug overlay (default: on)")
+    dist_render_parser.add_argument("--no-debug", dest="debug", action="store_false", help="Disable debug overlay")
+    dist_render_parser.add_argument("--optimize-assets", action="store_true", help="Right-size scene images before rendering")
+    dist_render_parser.add_argument("--stale-after", type=float, default=60.0, help="Reassign tasks silent for this many seconds (default: 60)")
+    dist_render_parser.set_defaults(func=cmd_dist_render)
+    
+    dist_worker_parser = dist_sub.add_parser("worker", help="Render queued segments until interrupted")
+    dist_worker_parser.add_argument("--queue", required=True, help="Queue directory on storage shared by all workers")
+    dist_worker_parser.add_argument("--worker-id", default=None, help="Name in claims/logs (default: host-pid)")
+    dist_worker_parser.add_argument("--heartbeat", type=float, default=10.0, help="Seconds between heartbeats (default: 10)")
+    dist_worker_parser.add_argument("--stale-after", type=float, default=60.0, help="Reclaim tasks silent for this many seconds (default: 60)")
+    dist_worker_parser.add_argument("--cache-dir", default=None, help="Machine-local browser cache (default: <tmp>/shorts-cache)")
+    dist_worker_parser.add_argument("--exit-when-idle", action="store_true", help="Exit once no task is left to claim")
+    dist_worker_parser.set_defaults(func=cmd_dist_worker)
+    
+    # Assets subcommands
+    assets_parser = subparsers.add_parser("assets", help="Scene asset utilities")
+    assets_sub = assets_parser.add_subparsers(dest="assets_command", required=True)
+    optimize_parser = assets_sub.add_parser("optimize", help="Right-size and re-encode images used by scene.html")
+    optimize_parser.add_argument("--id", required=True, help="Run ID whose scene to optimize")
+    optimize_parser.add_argument("--duration", type=int, default=60, help="Min duration in seconds to sample (default: 60)")
+    optimize_parser.add_argument("--format", choices=["webp", "avif", "png"], default="webp", help="Output format (default: webp)")
+    optimize_parser.add_argument("--quality", type=int, default=90, help="Encoder quality for webp/avif (default: 90)")
+    optimize_parser.set_defaults(func=cmd_assets_optimize)
+    
     return parser
 
 
@@ -9,6 +9,9 @@ def inject_debug_overlay(html: str, voiceover_segments: List[Dict[str, Any]]) ->
     Adds a fixed overlay at the top showing:
     - Current elapsed time
     - Current voiceover segment text
+    
+    Segments can be replaced after load via ``window.__shortsSetVoiceover(segments)``
+    (used when rendering starts while TTS is still streaming).
     """
     
     overlay_html = '''
@@ -19,21 +22,27 @@ def inject_debug_overlay(html: str, voiceover_segments: List[Dict[str, Any]]) ->
 '''
     
     segments_json = json.dumps(voiceover_segments)
-    end_ms = voiceover_segments[-1]['end_ms'] if voiceover_segments else 30000
     
     overlay_js = f'''
 <script>
 (function() {{
-  const __voSegments = {segments_json};
+  let __voSegments = {segments_json};
+  let __endMs = 30000;
   let __startTime = null;
   
+  window.__shortsSetVoiceover = function(segments) {{
+    __voSegments = segments;
+    __endMs = segments.length ? segments[segments.length - 1].end_ms : 30000;
+  }};
+  window.__shortsSetVoiceover(__voSegments);
+  
   function __updateDebug() {{
     if (!__startTime) return;
     const elapsed = Date.now() - __startTime;
     document.getElementById('debugTimer').textContent = (elapsed/1000).toFixed(1) + 's';
     const seg = __voSegments.find(s => elapsed >= s.start_ms && elapsed < s.end_ms);
     document.getElementById('debugScript').textContent = seg ? '"' + seg.text + '"' : '—';
-    if (elapsed < {end_ms} + 2000) requestAnimationFrame(__updateDebug);
+    if (elapsed < __endMs + 2000) requestAnimationFrame(__updateDebug);
   }}
   
   const __origPlayAll = window.__shortsPlayAll;
@@ -0,0 +1,476 @@
+"""Distributed rendering over a shared-filesystem work queue.
+
+A coordinator splits a render into frame-range segments and writes one task file
+per segment into a queue directory on shared storage (NFS, SMB, a synced volume).
+Workers on any machine that mounts it claim tasks, capture their frames under the
+deterministic clock, encode the segment and drop it back into the queue. The
+coordinator joins the segments with stream copy and muxes the audio.
+
+No broker: all coordination is atomic file operations.
+
+- claim: ``O_CREAT | O_EXCL`` create of ``claims/<task>.lock`` (holds a random token)
+- heartbeat: the owner bumps the lock's mtime; staleness is judged against the
+  shared filesystem's own clock, so machines do not need synchronized clocks
+- reassignment: a stale lock is renamed away (only one reclaimer can win the
+  rename, and a fresh claim moved by mistake is linked back) and the task becomes
+  claimable again; a worker that lost its claim sees a foreign token and drops
+  its result
+- completion: ``O_EXCL`` create of ``done/<task>.json`` - first finisher wins
+- cleanup: a joined job's directory is removed; a failed or abandoned job gets a
+  ``cancelled`` marker, so workers stop claiming (and drop running) segments of it
+
+Layout::
+
+    <queue>/jobs/<job_id>/job.json
+    <queue>/jobs/<job_id>/cancelled
+    <queue>/jobs/<job_id>/tasks/<task>.json
+    <queue>/jobs/<job_id>/claims/<task>.lock
+    <queue>/jobs/<job_id>/failed/<task>.<token>.txt
+    <queue>/jobs/<job_id>/done/<task>.json
+    <queue>/jobs/<job_id>/segments/<task>.<token>.mp4
+
+Every machine must see the scene (and the assets it references) at the same
+absolute path, e.g. by mounting the Shorts directory at the same location.
+"""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .renderer import (
+    RenderResult,
+    capture_frames_playwright,
+    ffmpeg_concat_cmd,
+    ffmpeg_encode_cmd,
+    ffmpeg_mux_wav_cmd,
+)
+
+
+# Browser profiles live on the worker's own disk, never in the shared Shorts dir
+LOCAL_CACHE_DIR = Path(tempfile.gettempdir()) / "shorts-cache"
+
+
+class JobFailedError(RuntimeError):
+    """A segment failed on too many workers."""
+
+
+@dataclass(frozen=True)
+class RenderJob:
+    job_id: str
+    html_path: str  # Absolute; must resolve identically on every worker
+    duration_ms: int
+    fps: int = 30
+    width: int = 1080
+    height: int = 1920
+    selector: str = ".shorts-container"
+
+    @property
+    def total_frames(self) -> int:
+        return int((self.duration_ms / 1000) * self.fps) + 1
+
+
+@dataclass(frozen=True)
+class SegmentTask:
+    job_id: str
+    task_id: str
+    start_frame: int
+    end_frame: int  # Exclusive
+
+
+@dataclass(frozen=True)
+class Claim:
+    task: SegmentTask
+    worker_id: str
+    token: str
+    lock_path: Path
+
+
+def _write_json_atomic(path: Path, data: Dict) -> None:
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _create_exclusive(path: Path, data: Dict) -> bool:
+    """Create ``path`` with ``data`` only if it does not exist yet (atomic)."""
+    try:
+        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+    except FileExistsError:
+        return False
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    return True
+
+
+def _read_json(path: Path) -> Optional[Dict]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None  # Missing, or caught mid-write by another machine
+
+
+class WorkQueue:
+    """File-lock based task queue rooted at a shared directory."""
+
+    def __init__(self, root: Path, *, stale_after_s: float = 60.0, max_attempts: int = 3) -> None:
+        self.root = root
+        self.stale_after_s = stale_after_s
+        self.max_attempts = max_attempts
+        (root / "jobs").mkdir(parents=True, exist_ok=True)
+
+    def _job_dir(self, job_id: str) -> Path:
+        return self.root / "jobs" / job_id
+
+    def fs_now(self) -> float:
+        """Current time according to the shared filesystem (compare with its mtimes)."""
+        probe = self.root / f".clock.{uuid.uuid4().hex}"
+        probe.touch()
+        try:
+            return probe.stat().st_mtime
+        finally:
+            probe.unlink(missing_ok=True)
+
+    # Coordinator side
+
+    def submit(self, job: RenderJob, *, segment_frames: int) -> List[SegmentTask]:
+        """Register ``job`` and split it into tasks of ``segment_frames`` frames."""
+        job_dir = self._job_dir(job.job_id)
+        for sub in ("tasks", "claims", "failed", "done", "segments"):
+            (job_dir / sub).mkdir(parents=True, exist_ok=True)
+        _write_json_atomic(job_dir / "job.json", asdict(job))
+        tasks = []
+        for n, start in enumerate(range(0, job.total_frames, segment_frames)):
+            task = SegmentTask(
+                job_id=job.job_id,
+                task_id=f"seg_{n:05d}",
+                start_frame=start,
+                end_frame=min(start + segment_frames, job.total_frames),
+            )
+            _write_json_atomic(job_dir / "tasks" / f"{task.task_id}.json", asdict(task))
+            tasks.append(task)
+        return tasks
+
+    def cancel(self, job_id: str) -> None:
+        """Stop handing out ``job_id``'s tasks; workers on it drop their claim at the next heartbeat."""
+        try:
+            (self._job_dir(job_id) / "cancelled").touch()
+        except FileNotFoundError:
+            pass  # Never submitted, or already removed
+
+    def cancelled(self, job_id: str) -> bool:
+        return (self._job_dir(job_id) / "cancelled").exists()
+
+    def remove(self, job_id: str) -> None:
+        """Delete a finished job and its segments from the shared directory."""
+        shutil.rmtree(self._job_dir(job_id), ignore_errors=True)
+
+    def load_job(self, job_id: str) -> RenderJob:
+        data = _read_json(self._job_dir(job_id) / "job.json")
+        if data is None:
+            raise FileNotFoundError(f"No job {job_id!r} in {self.root}")
+        return RenderJob(**data)
+
+    def tasks(self, job_id: str) -> List[SegmentTask]:
+        tasks = []
+        for path in sorted((self._job_dir(job_id) / "tasks").glob("*.json")):
+            data = _read_json(path)
+            if data is not None:
+                tasks.append(SegmentTask(**data))
+        return tasks
+
+    def done(self, job_id: str) -> Dict[str, Dict]:
+        """task_id -> completion record."""
+        out = {}
+        for path in (self._job_dir(job_id) / "done").glob("*.json"):
+            data = _read_json(path)
+            if data is not None:
+                out[path.stem] = data
+        return out
+
+    def failures(self, job_id: str, task_id: str) -> int:
+        return len(list((self._job_dir(job_id) / "failed").glob(f"{task_id}.*.txt")))
+
+    def status(self, job_id: str) -> Dict[str, int]:
+        tasks = self.tasks(job_id)
+        done = self.done(job_id)
+        claimed = {p.stem for p in (self._job_dir(job_id) / "claims").glob("*.lock")}
+        return {
+            "tasks": len(tasks),
+            "done": len(done),
+            "running": len(claimed - set(done)),
+            "failed": sum(1 for t in tasks if t.task_id not in done and self.failures(job_id, t.task_id) >= self.max_attempts),
+        }
+
+    def reap_stale(self, job_id: str) -> List[str]:
+        """Free tasks whose owner stopped heartbeating. Returns the reclaimed task ids."""
+        now = self.fs_now()
+        reclaimed = []
+        for lock in (self._job_dir(job_id) / "claims").glob("*.lock"):
+            if self._break_if_stale(lock, now):
+                reclaimed.append(lock.stem)
+        return reclaimed
+
+    def _break_if_stale(self, lock: Path, now: float) -> bool:
+        try:
+            if now - lock.stat().st_mtime < self.stale_after_s:
+                return False
+            seen = (_read_json(lock) or {}).get("token")
+            # Only one machine can win this rename; the loser gets FileNotFoundError
+            graveyard = lock.with_name(f".{lock.name}.{uuid.uuid4().hex}.stale")
+            os.rename(lock, graveyard)
+        except FileNotFoundError:
+            return False
+        # stat + rename is not atomic: another reclaimer may have replaced the stale lock
+        # with a fresh claim in between. If that is what we moved, put it back.
+        try:
+            moved_fresh = now - graveyard.stat().st_mtime < self.stale_after_s
+        except FileNotFoundError:
+            return False
+        if moved_fresh or (_read_json(graveyard) or {}).get("token") != seen:
+            try:
+                os.link(graveyard, lock)
+            except FileExistsError:
+                pass  # Yet another claim took the slot; the moved one's owner sees a foreign token
+            graveyard.unlink(missing_ok=True)
+            return False
+        graveyard.unlink(missing_ok=True)
+        return True
+
+    # Worker side
+
+    def claim(self, worker_id: str, *, job_id: Optional[str] = None) -> Optional[Claim]:
+        """Claim the first open task (optionally of one job), reclaiming stale ones."""
+        job_ids = [job_id] if job_id else sorted(p.name for p in (self.root / "jobs").iterdir() if p.is_dir())
+        now = None
+        for jid in job_ids:
+            if self.cancelled(jid):
+                continue
+            done = self.done(jid)
+            for task in self.tasks(jid):
+                if task.task_id in done or self.failures(jid, task.task_id) >= self.max_attempts:
+                    continue
+                lock = self._job_dir(jid) / "claims" / f"{task.task_id}.lock"
+                if lock.exists():
+                    now = now if now is not None else self.fs_now()
+                    if not self._break_if_stale(lock, now):
+                        continue
+                token = uuid.uuid4().hex
+                try:
+                    created = _create_exclusive(lock, {"worker": worker_id, "token": token})
+                except FileNotFoundError:
+                    break  # The coordinator removed the job meanwhile
+                if created:
+                    return Claim(task=task, worker_id=worker_id, token=token, lock_path=lock)
+        return None
+
+    def owns(self, claim: Claim) -> bool:
+        data = _read_json(claim.lock_path)
+        return data is not None and data.get("token") == claim.token
+
+    def heartbeat(self, claim: Claim) -> bool:
+        """Refresh the claim. Returns False if it was reassigned or the job cancelled."""
+        if not self.owns(claim) or self.cancelled(claim.task.job_id):
+            return False
+        try:
+            os.utime(claim.lock_path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def segment_path(self, claim: Claim) -> Path:
+        return self._job_dir(claim.task.job_id) / "segments" / f"{claim.task.task_id}.{claim.token}.mp4"
+
+    def complete(self, claim: Claim, segment: Path) -> bool:
+        """Publish a finished segment. Returns False if the claim was lost or beaten."""
+        if not self.owns(claim):
+            return False
+        done = self._job_dir(claim.task.job_id) / "done" / f"{claim.task.task_id}.json"
+        won = _create_exclusive(done, {"worker": claim.worker_id, "token": claim.token, "segment": segment.name})
+        claim.lock_path.unlink(missing_ok=True)
+        return won
+
+    def fail(self, claim: Claim, error: str) -> None:
+        """Record a failed attempt and release the task for another worker."""
+        failed = self._job_dir(claim.task.job_id) / "failed" / f"{claim.task.task_id}.{claim.token}.txt"
+        try:
+            failed.write_text(f"{claim.worker_id}: {error}\n", encoding="utf-8")
+        except FileNotFoundError:
+            return  # The job was removed
+        if self.owns(claim):
+            claim.lock_path.unlink(missing_ok=True)
+
+
+def render_segment(job: RenderJob, task: SegmentTask, out_mp4: Path, *,
+                   should_continue: Callable[[], bool] = lambda: True,
+                   cache_dir: Optional[Path] = LOCAL_CACHE_DIR) -> None:
+    """Capture ``task``'s frames (locally) and encode them to ``out_mp4``.
+
+    ``should_continue`` is polled per frame; returning False aborts the capture
+    (the claim was reassigned, so the work would be thrown away). ``cache_dir``
+    holds the browser profiles; it must be local to this machine, not the shared
+    Shorts dir (profile slots are flock'ed and paired with local ports).
+    """
+    with tempfile.TemporaryDirectory(prefix=f"shorts-{task.task_id}-") as tmp:
+        frames_dir = Path(tmp) / "frames"
+
+        def _check(page, i: int, t_ms: float) -> None:
+            if not should_continue():
+                raise RuntimeError("claim lost")
+
+        capture_frames_playwright(
+            html_path=Path(job.html_path),
+            frames_dir=frames_dir,
+            duration_ms=job.duration_ms,
+            fps=job.fps,
+            width=job.width,
+            height=job.height,
+            selector=job.selector,
+            start_frame=task.start_frame,
+            end_frame=task.end_frame,
+            before_frame=_check,
+            cache_dir=cache_dir,
+        )
+        local_mp4 = Path(tmp) / "segment.mp4"
+        cmd = ffmpeg_encode_cmd(
+            fps=job.fps,
+            frame_glob=str(frames_dir / "frame_%06d.png"),
+            out_mp4=local_mp4,
+            start_number=task.start_frame,
+        )
+        subprocess.run(cmd, check=True, capture_output=True)
+        # Copy then rename, so the shared directory never holds a partial segment
+        partial = out_mp4.with_name(f".{out_mp4.name}.partial")
+        shutil.copyfile(local_mp4, partial)
+        os.replace(partial, out_mp4)
+
+
+def run_worker(
+    queue: WorkQueue,
+    *,
+    worker_id: Optional[str] = None,
+    job_id: Optional[str] = None,
+    heartbeat_s: float = 10.0,
+    poll_s: float = 5.0,
+    exit_when_idle: bool = False,
+    cache_dir: Optional[Path] = LOCAL_CACHE_DIR,
+    log: Callable[[str], None] = print,
+) -> int:
+    """Claim and render segments until interrupted (or idle). Returns segments rendered.
+
+    ``cache_dir`` is this machine's browser cache (see ``render_segment``).
+    """
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    rendered = 0
+    while True:
+        claim = queue.claim(worker_id, job_id=job_id)
+        if claim is None:
+            if exit_when_idle:
+                return rendered
+            time.sleep(poll_s)
+            continue
+
+        task = claim.task
+        log(f"[{worker_id}] {task.job_id}/{task.task_id}: frames {task.start_frame}-{task.end_frame - 1}")
+        lost = threading.Event()
+        stop = threading.Event()
+
+        def _beat() -> None:
+            while not stop.wait(heartbeat_s):
+                if not queue.heartbeat(claim):
+                    lost.set()
+                    return
+
+        beater = threading.Thread(target=_beat, daemon=True)
+        beater.start()
+        try:
+            segment = queue.segment_path(claim)
+            render_segment(queue.load_job(task.job_id), task, segment,
+                           should_continue=lambda: not lost.is_set(), cache_dir=cache_dir)
+            if queue.complete(claim, segment):
+                rendered += 1
+                log(f"[{worker_id}] {task.job_id}/{task.task_id}: done")
+            else:
+                segment.unlink(missing_ok=True)
+                log(f"[{worker_id}] {task.job_id}/{task.task_id}: claim lost, result dropped")
+        except Exception as e:
+            if lost.is_set():
+                log(f"[{worker_id}] {task.job_id}/{task.task_id}: claim lost, aborted")
+            else:
+                queue.fail(claim, f"{type(e).__name__}: {e}")
+                log(f"[{worker_id}] {task.job_id}/{task.task_id}: FAILED: {e}")
+        finally:
+            stop.set()
+            beater.join()
+
+
+def wait_for_job(
+    queue: WorkQueue,
+    job_id: str,
+    *,
+    poll_s: float = 5.0,
+    log: Callable[[str], None] = print,
+) -> None:
+    """Block until every segment is done, reassigning stalled tasks meanwhile."""
+    last = None
+    while True:
+        for task_id in queue.reap_stale(job_id):
+            log(f"  -> {task_id}: worker stopped heartbeating, reassigning")
+        status = queue.status(job_id)
+        if status["failed"]:
+            raise JobFailedError(f"{status['failed']} segment(s) failed {queue.max_attempts} times; see failed/ in the queue")
+        if status["done"] == status["tasks"]:
+            return
+        if status != last:
+            log(f"  -> {status['done']}/{status['tasks']} segments done, {status['running']} running")
+            last = status
+        time.sleep(poll_s)
+
+
+def join_segments(
+    queue: WorkQueue,
+    job_id: str,
+    *,
+    output_dir: Path,
+    wav_path: Optional[Path] = None,
+) -> RenderResult:
+    """Concatenate finished segments (stream copy) and mux the audio."""
+    job_dir = queue.root / "jobs" / job_id
+    done = queue.done(job_id)
+    tasks = queue.tasks(job_id)
+    missing = [t.task_id for t in tasks if t.task_id not in done]
+    if missing:
+        raise RuntimeError(f"Segments not finished: {', '.join(missing)}")
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    list_file = output_dir / "segments.ffconcat"
+    lines = ["ffconcat version 1.0"]
+    for t in tasks:
+        segment = (job_dir / "segments" / done[t.task_id]["segment"]).resolve()
+        lines.append("file '" + str(segment).replace("'", "'\\''") + "'")
+    list_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    mp4_path = output_dir / "video.mp4"
+    subprocess.run(ffmpeg_concat_cmd(list_file=list_file, out_mp4=mp4_path), check=True, capture_output=True)
+
+    final_mp4_path: Optional[Path] = None
+    if wav_path and wav_path.exists():
+        final_mp4_path = output_dir / "final.mp4"
+        mux_cmd = ffmpeg_mux_wav_cmd(in_mp4=mp4_path, in_wav=wav_path, out_mp4=final_mp4_path)
+        subprocess.run(mux_cmd, check=True, capture_output=True)
+
+    return RenderResult(
+        frames_dir=job_dir / "segments",
+        frame_count=tasks[-1].end_frame if tasks else 0,
+        mp4_path=mp4_path,
+        final_mp4_path=final_mp4_path,
+    )
@@ -0,0 +1,501 @@
+"""Local stand-in for the Cartesia TTS API.
+
+Serves ``/tts/sse``, ``/tts/bytes`` and ``/tts/websocket`` on localhost with the
+same request and event shapes as the real API, so the TTS path can be tested and
+benchmarked without paying for live calls. Point ``CartesiaTTS(base_url=server.base_url)``
+at it.
+
+The audio is synthetic but realistic in shape: one tone burst per word with
+short gaps, streamed as base64 PCM chunks, interleaved with ``word_timestamps``
+events as the audio covering those words goes out. Latency, chunk size, pacing,
+jitter and failures are configurable through ``FakeCartesiaConfig``.
+
+Standard library only.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import os
+import random
+import re
+import struct
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_WS_TEXT, _WS_CLOSE, _WS_PING, _WS_PONG = 0x1, 0x8, 0x9, 0xA
+
+
+@dataclass(frozen=True)
+class FakeCartesiaConfig:
+    first_chunk_latency_ms: float = 150.0  # Before the first audio chunk / response body
+    chunk_ms: int = 100  # Audio duration per SSE chunk
+    chunk_interval_ms: float = 20.0  # Pause between chunks (generation speed)
+    jitter_ms: float = 0.0  # Uniform +/- jitter on every pause
+    ms_per_char: float = 55.0  # Speaking rate at speed 1.0
+    word_gap_ms: float = 40.0
+    error_rate: float = 0.0  # Fraction of requests answered with error_status
+    error_status: int = 500
+    drop_rate: float = 0.0  # Fraction of streams cut off mid-way (no terminating chunk)
+    seed: Optional[int] = None
+
+
+@dataclass
+class FakeCartesiaStats:
+    requests: int = 0
+    errors_injected: int = 0
+    streams_dropped: int = 0
+    ws_connections: int = 0
+    by_path: Dict[str, int] = field(default_factory=dict)
+
+
+def plan_words(transcript: str, *, speed: float, config: FakeCartesiaConfig) -> List[Tuple[str, float, float]]:
+    """Deterministic (word, start_s, end_s) timings for a transcript."""
+    t = 0.0
+    out = []
+    for word in transcript.split():
+        dur = max(120.0, len(word) * config.ms_per_char) / max(speed, 0.1) / 1000
+        out.append((word, t, t + dur))
+        t += dur + config.word_gap_ms / 1000
+    return out
+
+
+def synthesize_pcm(words: List[Tuple[str, float, float]], sample_rate: int) -> bytes:
+    """16-bit mono PCM: a tone burst per word, silence between words.
+
+    Built from pre-rendered 10 ms blocks so long transcripts stay cheap to generate.
+    """
+    import math
+
+    block_len = max(1, sample_rate // 100)
+    silence = b"\0\0" * block_len
+    tones = []
+    for freq in (200, 300, 400):  # Whole number of cycles per 10 ms block
+        samples = [int(6000 * math.sin(2 * math.pi * freq * i / sample_rate)) for i in range(block_len)]
+        tones.append(struct.pack(f"<{block_len}h", *samples))
+
+    out = bytearray()
+    cursor = 0  # In 10 ms blocks
+    for i, (_, start, end) in enumerate(words):
+        start_block, end_block = round(start * 100), max(round(end * 100), round(start * 100) + 1)
+        out += silence * (start_block - cursor)
+        out += tones[i % len(tones)] * (end_block - start_block)
+        cursor = end_block
+    return bytes(out)
+
+
+def wav_bytes(pcm: bytes, sample_rate: int) -> bytes:
+    header = struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + len(pcm), b"WAVE",
+        b"fmt ", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+        b"data", len(pcm),
+    )
+    return header + pcm
+
+
+def sse_events(
+    transcript: str,
+    *,
+    sample_rate: int,
+    speed: float,
+    config: FakeCartesiaConfig,
+    context_id: str = "",
+) -> Iterator[Dict[str, Any]]:
+    """Event sequence of one synthesis: audio chunks + timestamps, then done.
+
+    A word's timestamps are emitted right after the chunk that finishes its audio.
+    """
+    words = plan_words(transcript, speed=speed, config=config)
+    pcm = synthesize_pcm(words, sample_rate)
+    chunk_bytes = max(2, sample_rate * config.chunk_ms // 1000 * 2)
+    pending = list(words)
+    for offset in range(0, len(pcm), chunk_bytes):
+        chunk = pcm[offset:offset + chunk_bytes]
+        yield {"type": "chunk", "data": base64.b64encode(chunk).decode("ascii"), "done": False,
+               "context_id": context_id, "step_time": config.chunk_interval_ms}
+        covered_s = (offset + len(chunk)) / 2 / sample_rate
+        ready = [w for w in pending if w[2] <= covered_s + 1e-9]
+        if ready:
+            pending = pending[len(ready):]
+            yield _timestamps_event(ready, context_id)
+    if pending:
+        yield _timestamps_event(pending, context_id)
+    yield {"type": "done", "done": True, "context_id": context_id}
+
+
+def _timestamps_event(words: List[Tuple[str, float, float]], context_id: str) -> Dict[str, Any]:
+    return {
+        "type": "timestamps",
+        "done": False,
+        "context_id": context_id,
+        "word_timestamps": {
+            "words": [w for w, _, _ in words],
+            "start": [round(s, 3) for _, s, _ in words],
+            "end": [round(e, 3) for _, _, e in words],
+        },
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_Server"
+
+    def log_message(self, format: str, *args: Any) -> None:  # Quiet by default
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _sleep(self, ms: float) -> None:
+        cfg = self.server.config
+        if cfg.jitter_ms:
+            with self.server.lock:
+                ms += self.server.rng.uniform(-cfg.jitter_ms, cfg.jitter_ms)
+        if ms > 0:
+            time.sleep(ms / 1000)
+
+    def _roll(self, rate: float) -> bool:
+        with self.server.lock:
+            return rate > 0 and self.server.rng.random() < rate
+
+    def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def do_POST(self) -> None:
+        stats = self.server.stats
+        with self.server.lock:
+            stats.requests += 1
+            stats.by_path[self.path] = stats.by_path.get(self.path, 0) + 1
+
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            return self._send_json(400, {"error": "invalid JSON"})
+        if not (self.headers.get("Authorization") or self.headers.get("X-API-Key")):
+            return self._send_json(401, {"error": "missing API key"})
+        if self.path not in ("/tts/sse", "/tts/bytes"):
+            return self._send_json(404, {"error": f"unknown endpoint {self.path}"})
+        if not payload.get("transcript"):
+            return self._send_json(400, {"error": "transcript is required"})
+
+        cfg = self.server.config
+        if self._roll(cfg.error_rate):
+            with self.server.lock:
+                stats.errors_injected += 1
+            self._sleep(cfg.first_chunk_latency_ms)
+            return self._send_json(cfg.error_status, {"error": "injected failure"})
+
+        sample_rate = int(payload.get("output_format", {}).get("sample_rate", 44100))
+        speed = float(payload.get("generation_config", {}).get("speed", 1.0) or 1.0)
+        self._sleep(cfg.first_chunk_latency_ms)
+
+        if self.path == "/tts/bytes":
+            words = plan_words(payload["transcript"], speed=speed, config=cfg)
+            body = wav_bytes(synthesize_pcm(words, sample_rate), sample_rate)
+            self.send_response(200)
+            self.send_header("Content-Type", "audio/wav")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        events = sse_events(payload["transcript"], sample_rate=sample_rate, speed=speed, config=cfg)
+        drop_after = None
+        if self._roll(cfg.drop_rate):
+            words = plan_words(payload["transcript"], speed=speed, config=cfg)
+            drop_after = max(1, int(words[-1][2] * 1000 / cfg.chunk_ms) // 2) if words else 1
+        chunks_sent = 0
+        for event in events:
+            if event["type"] == "chunk":
+                if chunks_sent == drop_after:
+                    with self.server.lock:
+                        stats.streams_dropped += 1
+                    self.close_connection = True
+                    return  # No terminating chunk: the client sees a truncated body
+                if chunks_sent:
+                    self._sleep(cfg.chunk_interval_ms)
+                chunks_sent += 1
+            self._write_chunk(f"data: {json.dumps(event)}\n\n".encode())
+        self._write_chunk(b"")
+
+    # WebSocket: one connection, many contexts (each generated on its own thread)
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        if url.path != "/tts/websocket":
+            return self._send_json(404, {"error": f"unknown endpoint {url.path}"})
+        key = self.headers.get("Sec-WebSocket-Key")
+        if self.headers.get("Upgrade", "").lower() != "websocket" or not key:
+            return self._send_json(400, {"error": "expected a WebSocket upgrade"})
+        if not (parse_qs(url.query).get("api_key") or self.headers.get("X-API-Key")):
+            return self._send_json(401, {"error": "missing API key"})
+
+        accept = base64.b64encode(hashlib.sha1((key + _WS_GUID).encode()).digest()).decode()
+        self.send_response(101)
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept)
+        self.end_headers()
+        self.wfile.flush()
+        self.close_connection = True
+        with self.server.lock:
+            self.server.stats.ws_connections += 1
+
+        self._ws_write_lock = threading.Lock()
+        self._ws_dropped = threading.Event()
+        cancelled: Dict[str, threading.Event] = {}
+        while not self._ws_dropped.is_set():
+            try:
+                opcode, data = self._ws_read()
+            except (ConnectionError, OSError, ValueError):
+                break
+            if opcode == _WS_CLOSE:
+                self._ws_send(_WS_CLOSE, data[:2])
+                break
+            if opcode == _WS_PING:
+                self._ws_send(_WS_PONG, data)
+                continue
+            if opcode != _WS_TEXT:
+                continue
+            try:
+                request = json.loads(data)
+            except json.JSONDecodeError:
+                self._ws_send_json({"type": "error", "error": "invalid JSON", "status_code": 400, "done": True})
+                continue
+            context_id = str(request.get("context_id", ""))
+            if request.get("cancel"):
+                cancelled.setdefault(context_id, threading.Event()).set()
+                continue
+            cancel = cancelled[context_id] = threading.Event()
+            threading.Thread(target=self._ws_context, args=(request, context_id, cancel), daemon=True).start()
+
+    def _ws_context(self, request: Dict[str, Any], context_id: str, cancel: threading.Event) -> None:
+        stats, cfg = self.server.stats, self.server.config
+        with self.server.lock:
+            stats.requests += 1
+            stats.by_path["/tts/websocket"] = stats.by_path.get("/tts/websocket", 0) + 1
+        try:
+            if not request.get("transcript"):
+                return self._ws_send_json({"type": "error", "context_id": context_id, "done": True,
+                                           "status_code": 400, "error": "transcript is required"})
+            if self._roll(cfg.error_rate):
+                with self.server.lock:
+                    stats.errors_injected += 1
+                self._sleep(cfg.first_chunk_latency_ms)
+                return self._ws_send_json({"type": "error", "context_id": context_id, "done": True,
+                                           "status_code": cfg.error_status, "error": "injected failure"})
+
+            sample_rate = int(request.get("output_format", {}).get("sample_rate", 44100))
+            speed = float(request.get("generation_config", {}).get("speed", 1.0) or 1.0)
+            drop_after = None
+            if self._roll(cfg.drop_rate):
+                words = plan_words(request["transcript"], speed=speed, config=cfg)
+                drop_after = max(1, int(words[-1][2] * 1000 / cfg.chunk_ms) // 2) if words else 1
+            self._sleep(cfg.first_chunk_latency_ms)
+            chunks_sent = 0
+            for event in sse_events(request["transcript"], sample_rate=sample_rate, speed=speed,
+                                    config=cfg, context_id=context_id):
+                if cancel.is_set() or self._ws_dropped.is_set():
+                    return
+                if event["type"] == "chunk":
+                    if chunks_sent == drop_after:
+                        # Like a network failure: the whole connection goes, no close frame
+                        with self.server.lock:
+                            stats.streams_dropped += 1
+                        self._ws_dropped.set()
+                        self.connection.shutdown(2)
+                        return
+                    if chunks_sent:
+                        self._sleep(cfg.chunk_interval_ms)
+                    chunks_sent += 1
+                self._ws_send_json(event)
+        except OSError:
+            self._ws_dropped.set()  # Client went away
+
+    def _ws_read(self) -> Tuple[int, bytes]:
+        """Read one (possibly fragmented) message. Client frames are always masked."""
+        message, message_opcode = b"", 0
+        while True:
+            header = self.rfile.read(2)
+            if len(header) < 2:
+                raise ConnectionError("WebSocket closed")
+            fin, opcode = header[0] & 0x80, header[0] & 0x0F
+            length = header[1] & 0x7F
+            if length == 126:
+                (length,) = struct.unpack(">H", self.rfile.read(2))
+            elif length == 127:
+                (length,) = struct.unpack(">Q", self.rfile.read(8))
+            mask = self.rfile.read(4) if header[1] & 0x80 else b"\0\0\0\0"
+            data = self.rfile.read(length)
+            if len(data) < length:
+                raise ConnectionError("WebSocket closed")
+            # XOR with the repeated 4-byte mask as one big integer
+            key = (mask * (length // 4 + 1))[:length]
+            data = (int.from_bytes(data, "big") ^ int.from_bytes(key, "big")).to_bytes(length, "big")
+            if opcode >= 0x8:  # Control frames may arrive between fragments
+                return opcode, data
+            message += data
+            message_opcode = message_opcode or opcode
+            if fin:
+                return message_opcode, message
+
+    def _ws_send(self, opcode: int, data: bytes) -> None:
+        n = len(data)
+        if n < 126:
+            header = struct.pack(">BB", 0x80 | opcode, n)
+        elif n < 1 << 16:
+            header = struct.pack(">BBH", 0x80 | opcode, 126, n)
+        else:
+            header = struct.pack(">BBQ", 0x80 | opcode, 127, n)
+        with self._ws_write_lock:
+            self.wfile.write(header + data)
+            self.wfile.flush()
+
+    def _ws_send_json(self, event: Dict[str, Any]) -> None:
+        self._ws_send(_WS_TEXT, json.dumps(event).encode())
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], config: FakeCartesiaConfig, verbose: bool) -> None:
+        super().__init__(address, _Handler)
+        self.config = config
+        self.verbose = verbose
+        self.stats = FakeCartesiaStats()
+        self.lock = threading.Lock()
+        self.rng = random.Random(config.seed)
+
+
+class FakeCartesiaServer:
+    """Run the stand-in on a background thread::
+
+        with FakeCartesiaServer(FakeCartesiaConfig(chunk_interval_ms=0)) as server:
+            tts = CartesiaTTS(api_key="test", base_url=server.base_url)
+    """
+
+    def __init__(self, config: Optional[FakeCartesiaConfig] = None, *, host: str = "127.0.0.1",
+                 port: int = 0, verbose: bool = False) -> None:
+        self._server = _Server((host, port), config or FakeCartesiaConfig(), verbose)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def stats(self) -> FakeCartesiaStats:
+        return self._server.stats
+
+    def start(self) -> "FakeCartesiaServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-cartesia", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "FakeCartesiaServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+class FakeCartesiaProcess:
+    """Run the stand-in in a child process (``shorts fake-cartesia``)::
+
+        with FakeCartesiaProcess(config) as server:
+            tts = CartesiaTTS(api_key="test", base_url=server.base_url)
+
+    Use this when measuring the client: an in-process server competes with it for
+    the GIL and skews its timings. ``stats`` are not available across the process.
+    """
+
+    def __init__(self, config: Optional[FakeCartesiaConfig] = None, *, host: str = "127.0.0.1") -> None:
+        self.config = config or FakeCartesiaConfig()
+        self.host = host
+        self.base_url = ""
+        self._proc: Optional[subprocess.Popen] = None
+
+    def _args(self) -> List[str]:
+        cfg = self.config
+        args = [
+            "--latency-ms", str(cfg.first_chunk_latency_ms),
+            "--chunk-ms", str(cfg.chunk_ms),
+            "--chunk-interval-ms", str(cfg.chunk_interval_ms),
+            "--jitter-ms", str(cfg.jitter_ms),
+            "--ms-per-char", str(cfg.ms_per_char),
+            "--word-gap-ms", str(cfg.word_gap_ms),
+            "--error-rate", str(cfg.error_rate),
+            "--error-status", str(cfg.error_status),
+            "--drop-rate", str(cfg.drop_rate),
+        ]
+        if cfg.seed is not None:
+            args += ["--seed", str(cfg.seed)]
+        return args
+
+    def start(self) -> "FakeCartesiaProcess":
+        env = dict(os.environ)
+        package_root = str(Path(__file__).resolve().parent.parent)
+        env["PYTHONPATH"] = os.pathsep.join(p for p in (package_root, env.get("PYTHONPATH")) if p)
+        self._proc = subprocess.Popen(
+            [sys.executable, "-m", "agent.cli", "fake-cartesia", "--host", self.host, "--port", "0", *self._args()],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            env=env,
+        )
+        assert self._proc.stdout is not None
+        for line in self._proc.stdout:
+            m = re.search(r"listening on (\S+)", line)
+            if m:
+                self.base_url = m.group(1)
+                return self
+        self._proc.wait()
+        raise RuntimeError(f"fake-cartesia exited during startup (status {self._proc.returncode})")
+
+    def stop(self) -> None:
+        if self._proc is None:
+            return
+        self._proc.terminate()
+        try:
+            self._proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+            self._proc.wait()
+        if self._proc.stdout:
+            self._proc.stdout.close()
+        self._proc = None
+
+    def __enter__(self) -> "FakeCartesiaProcess":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
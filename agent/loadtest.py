@@ -0,0 +1,166 @@
+"""TTS client load test.
+
+Fires concurrent ``synthesize_with_timestamps`` calls (normally at the bundled
+stand-in, run in a child process) - one SSE request each, or one context each on
+a shared WebSocket - and reports time-to-first-chunk, total latency, client-side
+parse throughput and memory.
+"""
+from __future__ import annotations
+
+import statistics
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from .cartesia_tts import CartesiaTTS, CartesiaWebSocket
+
+
+@dataclass(frozen=True)
+class RequestStats:
+    ok: bool
+    total_ms: float
+    ttfc_ms: Optional[float] = None  # Time to first audio chunk
+    audio_bytes: int = 0
+    chunks: int = 0
+    words: int = 0
+    error: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class LoadTestResult:
+    requests: List[RequestStats]
+    concurrency: int
+    wall_ms: float
+    peak_traced_bytes: int  # Python allocations (tracemalloc) of one untimed batch, measured separately
+    max_rss_bytes: Optional[int]  # Process high-water mark, where the platform reports it
+
+    def summary(self) -> Dict[str, object]:
+        ok = [r for r in self.requests if r.ok]
+        ttfc = [r.ttfc_ms for r in ok if r.ttfc_ms is not None]
+        total = [r.total_ms for r in ok]
+        audio_bytes = sum(r.audio_bytes for r in ok)
+        # Time spent receiving + parsing the stream after the first chunk arrived
+        stream_s = sum(r.total_ms - (r.ttfc_ms or 0.0) for r in ok) / 1000
+        return {
+            "requests": len(self.requests),
+            "ok": len(ok),
+            "errors": len(self.requests) - len(ok),
+            "concurrency": self.concurrency,
+            "wall_s": round(self.wall_ms / 1000, 3),
+            "requests_per_s": round(len(self.requests) / (self.wall_ms / 1000), 2) if self.wall_ms else 0.0,
+            "ttfc_ms": _percentiles(ttfc),
+            "total_ms": _percentiles(total),
+            "audio_mb_per_s": round(audio_bytes / 1e6 / stream_s, 2) if stream_s else 0.0,
+            "chunks_per_s": round(sum(r.chunks for r in ok) / stream_s, 1) if stream_s else 0.0,
+            "peak_traced_mb": round(self.peak_traced_bytes / 1e6, 2),
+            "max_rss_mb": round(self.max_rss_bytes / 1e6, 1) if self.max_rss_bytes else None,
+        }
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    values = sorted(values)
+    if len(values) == 1:
+        p50 = p95 = values[0]
+    else:
+        q = statistics.quantiles(values, n=100, method="inclusive")
+        p50, p95 = q[49], q[94]
+    return {"p50": round(p50, 1), "p95": round(p95, 1), "max": round(values[-1], 1)}
+
+
+def _max_rss_bytes() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    import sys
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def _one_request(tts: Union[CartesiaTTS, CartesiaWebSocket], *, text: str, voice_id: str, out_wav_path: Path) -> RequestStats:
+    start = time.perf_counter()
+    first: List[float] = []
+    sizes: List[int] = []
+
+    def on_audio(chunk: bytes) -> None:
+        if not first:
+            first.append(time.perf_counter())
+        sizes.append(len(chunk))
+
+    try:
+        words = tts.synthesize_with_timestamps(
+            text=text, voice_id=voice_id, out_wav_path=out_wav_path, on_audio=on_audio
+        )
+    except Exception as e:
+        return RequestStats(ok=False, total_ms=(time.perf_counter() - start) * 1000, error=f"{type(e).__name__}: {e}")
+    end = time.perf_counter()
+    return RequestStats(
+        ok=True,
+        total_ms=(end - start) * 1000,
+        ttfc_ms=(first[0] - start) * 1000 if first else None,
+        audio_bytes=sum(sizes),
+        chunks=len(sizes),
+        words=len(words),
+    )
+
+
+def run_tts_load_test(
+    tts: CartesiaTTS,
+    *,
+    text: str,
+    voice_id: str,
+    requests: int = 20,
+    concurrency: int = 4,
+    websocket: bool = False,
+    measure_memory: bool = True,
+) -> LoadTestResult:
+    """Run ``requests`` syntheses, ``concurrency`` at a time, and collect stats.
+
+    With ``websocket``, every request is a context on one shared connection
+    (connection setup counts towards the wall time, not per-request latency).
+
+    Timings are taken with tracemalloc off (it slows every allocation); with
+    ``measure_memory`` one more batch of ``concurrency`` requests then runs untimed
+    under tracemalloc. Point ``tts`` at an out-of-process server (see
+    ``FakeCartesiaProcess``) so the stand-in does not compete for the GIL.
+    """
+    with tempfile.TemporaryDirectory(prefix="shorts-loadtest-") as tmp:
+        client = tts.websocket() if websocket else nullcontext(tts)
+        with client as synth:
+
+            def _batch(n: int, prefix: str) -> List[RequestStats]:
+                with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                    futures = [
+                        pool.submit(_one_request, synth, text=text, voice_id=voice_id,
+                                    out_wav_path=Path(tmp) / f"{prefix}{i}.wav")
+                        for i in range(n)
+                    ]
+                    return [f.result() for f in futures]
+
+            start = time.perf_counter()
+            stats = _batch(requests, "")
+            wall_ms = (time.perf_counter() - start) * 1000
+
+            peak = 0
+            if measure_memory:
+                tracemalloc.start()
+                try:
+                    _batch(concurrency, "mem-")
+                    _, peak = tracemalloc.get_traced_memory()
+                finally:
+                    tracemalloc.stop()
+    return LoadTestResult(
+        requests=stats,
+        concurrency=concurrency,
+        wall_ms=wall_ms,
+        peak_traced_bytes=peak,
+        max_rss_bytes=_max_rss_bytes(),
+    )
@@ -0,0 +1,456 @@
+"""Scene cost profiler.
+
+Plays a scene under the deterministic clock with Chromium tracing on, the way the
+renderer does (full-size container, seek + screenshot per frame), and works out where the time
+goes:
+
+- per category: script, style, layout, paint, raster, composite (self time, so a
+  forced layout inside a timer callback counts as layout, not script)
+- per DOM element: paint and layout time from the trace's node ids, plus raster
+  time shared out over the elements painted into each layer
+- per CSS property: element cost summed over the expensive properties it uses
+  (filter, box-shadow, backdrop-filter, ...)
+- per timer: every ``setTimeout`` / ``requestAnimationFrame`` callback is wrapped
+  so its script time and the style/layout it forces are attributed to it
+- per frame: a cost timeline, to see which moments of the scene are slow
+
+Requires Playwright (Chromium).
+"""
+from __future__ import annotations
+
+import bisect
+import csv
+import json
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .renderer import load_scene, unscale_container
+
+TRACE_CATEGORIES = [
+    "devtools.timeline",
+    "disabled-by-default-devtools.timeline",
+    "disabled-by-default-devtools.timeline.frame",
+    "v8.execute",
+    "blink.console",
+]
+
+EVENT_CATEGORIES = {
+    "FunctionCall": "script",
+    "EvaluateScript": "script",
+    "TimerFire": "script",
+    "FireAnimationFrame": "script",
+    "EventDispatch": "script",
+    "RunMicrotasks": "script",
+    "v8.compile": "script",
+    "v8.compileModule": "script",
+    "MinorGC": "script",
+    "MajorGC": "script",
+    "UpdateLayoutTree": "style",
+    "RecalculateStyles": "style",
+    "ParseAuthorStyleSheet": "style",
+    "Layout": "layout",
+    "PrePaint": "paint",
+    "Paint": "paint",
+    "PaintImage": "paint",
+    "Layerize": "paint",
+    "UpdateLayerTree": "paint",
+    "RasterTask": "raster",
+    "Decode Image": "raster",
+    "ImageDecodeTask": "raster",
+    "GPUTask": "raster",
+    "CompositeLayers": "composite",
+    "Commit": "composite",
+}
+CATEGORIES = ("script", "style", "layout", "paint", "raster", "composite")
+
+FRAME_MARK = "shorts-frame:"
+TIMER_MARK = "shorts-timer:"
+
+# Wraps the virtual clock's setTimeout/requestAnimationFrame so every callback is
+# bracketed by trace markers and timed on the wall clock.
+_INSTRUMENT_JS = """
+(() => {
+  const realNow = window.__realPerfNow;
+  const labels = window.__shortsTimerLabels = {};
+  let nextId = 1;
+  const describe = (cb) => (cb.name || String(cb)).replace(/\\s+/g, ' ').slice(0, 80);
+  const wrap = (kind, cb, extra) => {
+    const label = kind + extra + ' ' + describe(cb);
+    return (...args) => {
+      const id = nextId++;
+      labels[id] = {label, fired_at_ms: window.__virtualTime};
+      console.timeStamp('""" + TIMER_MARK + """' + id + ':start');
+      const t0 = realNow();
+      try { return cb(...args); }
+      finally {
+        labels[id].wall_ms = realNow() - t0;
+        console.timeStamp('""" + TIMER_MARK + """' + id + ':end');
+      }
+    };
+  };
+  const setTimeout_ = window.setTimeout;
+  window.setTimeout = (cb, delay, ...args) =>
+    typeof cb === 'function' ? setTimeout_(wrap('setTimeout', cb, '(' + (delay || 0) + 'ms)'), delay, ...args)
+                             : setTimeout_(cb, delay, ...args);
+  const raf_ = window.requestAnimationFrame;
+  window.requestAnimationFrame = (cb) => raf_(wrap('requestAnimationFrame', cb, ''));
+})();
+"""
+
+# Readable selector + non-default expensive CSS for a node (text nodes -> parent).
+_DESCRIBE_NODE_JS = """
+function() {
+  const el = this.nodeType === 1 ? this : this.parentElement;
+  if (!el) return {selector: this.nodeName, css: {}};
+  const part = (e) => e.tagName.toLowerCase() + (e.id ? '#' + e.id : '') +
+    [...e.classList].slice(0, 3).map(c => '.' + c).join('');
+  const path = [];
+  for (let e = el; e && e.nodeType === 1 && path.length < 3; e = e.parentElement) {
+    path.unshift(part(e));
+    if (e.id) break;
+  }
+  const cs = getComputedStyle(el);
+  const css = {};
+  const check = (prop, isDefault) => { const v = cs[prop]; if (v && !isDefault(v)) css[prop] = v; };
+  check('filter', v => v === 'none');
+  check('backdropFilter', v => v === 'none');
+  check('boxShadow', v => v === 'none');
+  check('textShadow', v => v === 'none');
+  check('mixBlendMode', v => v === 'normal');
+  check('clipPath', v => v === 'none');
+  check('maskImage', v => v === 'none');
+  check('willChange', v => v === 'auto');
+  check('transform', v => v === 'none');
+  check('opacity', v => v === '1');
+  check('backgroundImage', v => v === 'none');
+  return {selector: path.join(' > '), css};
+}
+"""
+
+
+@dataclass
+class Cost:
+    script: float = 0.0
+    style: float = 0.0
+    layout: float = 0.0
+    paint: float = 0.0
+    raster: float = 0.0
+    composite: float = 0.0
+
+    def add(self, category: str, ms: float) -> None:
+        setattr(self, category, getattr(self, category) + ms)
+
+    @property
+    def total(self) -> float:
+        return sum(getattr(self, c) for c in CATEGORIES)
+
+    def as_dict(self) -> Dict[str, float]:
+        d = {c: round(getattr(self, c), 3) for c in CATEGORIES}
+        d["total"] = round(self.total, 3)
+        return d
+
+
+@dataclass
+class ProfileReport:
+    frames: int
+    fps: int
+    totals: Dict[str, float]
+    elements: List[Dict[str, Any]] = field(default_factory=list)
+    css_properties: List[Dict[str, Any]] = field(default_factory=list)
+    timers: List[Dict[str, Any]] = field(default_factory=list)
+    timeline: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def normalize_events(trace: Any) -> List[Dict[str, Any]]:
+    """Trace JSON -> complete ('X') events with ``ts``/``dur`` in ms, plus instants.
+
+    Begin/end ('B'/'E') pairs are folded into complete events per thread.
+    """
+    raw = trace["traceEvents"] if isinstance(trace, dict) else trace
+    out: List[Dict[str, Any]] = []
+    open_: Dict[Tuple[int, int], List[Dict[str, Any]]] = defaultdict(list)
+    for e in raw:
+        ph = e.get("ph")
+        if ph == "X":
+            out.append({**e, "ts": e["ts"] / 1000, "dur": e.get("dur", 0) / 1000})
+        elif ph == "B":
+            open_[(e.get("pid"), e.get("tid"))].append(e)
+        elif ph == "E":
+            stack = open_[(e.get("pid"), e.get("tid"))]
+            if stack:
+                b = stack.pop()
+                args = {**b.get("args", {}), **e.get("args", {})}
+                out.append({**b, "ph": "X", "args": args, "ts": b["ts"] / 1000, "dur": (e["ts"] - b["ts"]) / 1000})
+        elif ph in ("I", "i", "R"):
+            out.append({**e, "ts": e["ts"] / 1000, "dur": 0.0})
+    out.sort(key=lambda e: (e["ts"], -e["dur"]))
+    return out
+
+
+def self_times(events: Iterable[Dict[str, Any]]) -> Dict[int, float]:
+    """Self time (ms) of each complete event, keyed by ``id(event)``.
+
+    Children are events on the same thread that start and end within their parent.
+    ``events`` must be sorted by (ts, -dur), as ``normalize_events`` returns them.
+    """
+    result: Dict[int, float] = {}
+    stacks: Dict[Tuple[int, int], List[Dict[str, Any]]] = defaultdict(list)
+    for e in events:
+        if e.get("ph") != "X":
+            continue
+        stack = stacks[(e.get("pid"), e.get("tid"))]
+        while stack and stack[-1]["ts"] + stack[-1]["dur"] <= e["ts"]:
+            stack.pop()
+        if stack and e["ts"] + e["dur"] <= stack[-1]["ts"] + stack[-1]["dur"] + 1e-6:
+            result[id(stack[-1])] -= e["dur"]
+        result[id(e)] = e["dur"]
+        stack.append(e)
+    return result
+
+
+def _message(e: Dict[str, Any]) -> str:
+    return (e.get("args", {}).get("data") or {}).get("message", "") if e.get("name") == "TimeStamp" else ""
+
+
+def _event_nodes(e: Dict[str, Any]) -> List[int]:
+    """Backend DOM node ids an event can be attributed to."""
+    args = e.get("args", {})
+    if e["name"] == "Paint":
+        node = (args.get("data") or {}).get("nodeId")
+        return [node] if node else []
+    if e["name"] == "Layout":
+        roots = (args.get("endData") or {}).get("layoutRoots") or []
+        return [r["nodeId"] for r in roots if r.get("nodeId")]
+    return []
+
+
+def _event_layer(e: Dict[str, Any]) -> Optional[int]:
+    args = e.get("args", {})
+    if e["name"] == "Paint":
+        return (args.get("data") or {}).get("layerId")
+    if e["name"] == "RasterTask":
+        return (args.get("tileData") or {}).get("layerId")
+    return None
+
+
+def analyze_trace(
+    events: List[Dict[str, Any]],
+    *,
+    timer_labels: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Tuple[Cost, List[Cost], Dict[int, Cost], Dict[str, Dict[str, Any]]]:
+    """Attribute categorized self time to frames, DOM nodes and timers.
+
+    Returns (totals, per-frame costs, per-node costs, per-timer stats).
+    """
+    selfs = self_times(events)
+
+    frame_starts: List[float] = []
+    timer_windows: List[Tuple[float, float, str, Tuple[int, int]]] = []
+    open_timers: Dict[str, Tuple[float, Tuple[int, int]]] = {}
+    for e in events:
+        msg = _message(e)
+        if msg.startswith(FRAME_MARK):
+            frame_starts.append(e["ts"])
+        elif msg.startswith(TIMER_MARK):
+            timer_id, _, edge = msg[len(TIMER_MARK):].partition(":")
+            thread = (e.get("pid"), e.get("tid"))
+            if edge == "start":
+                open_timers[timer_id] = (e["ts"], thread)
+            elif timer_id in open_timers:
+                start, thread = open_timers.pop(timer_id)
+                timer_windows.append((start, e["ts"], timer_id, thread))
+    timer_windows.sort()
+
+    totals = Cost()
+    per_frame = [Cost() for _ in frame_starts]
+    per_node: Dict[int, Cost] = defaultdict(Cost)
+    per_timer: Dict[str, Cost] = defaultdict(Cost)
+    layer_paint: Dict[int, Dict[int, float]] = defaultdict(lambda: defaultdict(float))
+    layer_raster: Dict[int, float] = defaultdict(float)
+
+    timer_starts = [w[0] for w in timer_windows]
+    for e in events:
+        category = EVENT_CATEGORIES.get(e.get("name"))
+        if e.get("ph") != "X" or category is None or not frame_starts or e["ts"] < frame_starts[0]:
+            continue
+        ms = max(0.0, selfs.get(id(e), 0.0))
+        totals.add(category, ms)
+        per_frame[bisect.bisect_right(frame_starts, e["ts"]) - 1].add(category, ms)
+
+        nodes = _event_nodes(e)
+        for node in nodes:
+            per_node[node].add(category, ms / len(nodes))
+        layer = _event_layer(e)
+        if layer is not None:
+            if category == "paint":
+                for node in nodes:
+                    layer_paint[layer][node] += ms / len(nodes)
+            elif category == "raster":
+                layer_raster[layer] += ms
+
+        # Forced style/layout inside a timer callback belongs to that timer.
+        # Callbacks run one after another inside __seekToTime, so windows never overlap.
+        if category in ("style", "layout"):
+            i = bisect.bisect_right(timer_starts, e["ts"]) - 1
+            if i >= 0:
+                start, end, timer_id, thread = timer_windows[i]
+                if e["ts"] <= end and thread == (e.get("pid"), e.get("tid")):
+                    per_timer[timer_id].add(category, ms)
+
+    # Raster has no node ids: share each layer's raster time by paint share
+    for layer, raster_ms in layer_raster.items():
+        painted = layer_paint.get(layer)
+        if not painted:
+            continue
+        paint_total = sum(painted.values()) or 1.0
+        for node, paint_ms in painted.items():
+            per_node[node].add("raster", raster_ms * paint_ms / paint_total)
+
+    timers: Dict[str, Dict[str, Any]] = {}
+    for timer_id, info in (timer_labels or {}).items():
+        cost = per_timer.get(timer_id, Cost())
+        cost.script = max(0.0, info.get("wall_ms", 0.0) - cost.style - cost.layout)
+        stats = timers.setdefault(info["label"], {"label": info["label"], "calls": 0, "fired_at_ms": [], "cost": Cost()})
+        stats["calls"] += 1
+        stats["fired_at_ms"].append(info.get("fired_at_ms"))
+        for c in CATEGORIES:
+            stats["cost"].add(c, getattr(cost, c))
+    return totals, per_frame, dict(per_node), timers
+
+
+def build_report(
+    *,
+    fps: int,
+    totals: Cost,
+    per_frame: List[Cost],
+    per_node: Dict[int, Cost],
+    node_info: Dict[int, Dict[str, Any]],
+    timers: Dict[str, Dict[str, Any]],
+    frame_wall_ms: Optional[List[float]] = None,
+) -> ProfileReport:
+    """Rank elements, CSS properties and timers by total cost.
+
+    ``frame_wall_ms`` (seek + screenshot time measured from Python) is added to the
+    timeline when given.
+    """
+    elements: Dict[str, Dict[str, Any]] = {}
+    for node, cost in per_node.items():
+        info = node_info.get(node, {"selector": f"<detached node {node}>", "css": {}})
+        entry = elements.setdefault(info["selector"], {"selector": info["selector"], "css": info["css"], "cost": Cost()})
+        for c in CATEGORIES:
+            entry["cost"].add(c, getattr(cost, c))
+
+    css: Dict[str, Dict[str, Any]] = {}
+    for entry in elements.values():
+        for prop in entry["css"]:
+            p = css.setdefault(prop, {"property": prop, "elements": 0, "cost": Cost()})
+            p["elements"] += 1
+            for c in CATEGORIES:
+                p["cost"].add(c, getattr(entry["cost"], c))
+
+    def _ranked(items: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        ranked = sorted(items, key=lambda d: d["cost"].total, reverse=True)
+        return [{**d, "cost": d["cost"].as_dict()} for d in ranked]
+
+    timeline = []
+    for i, cost in enumerate(per_frame):
+        row = {"frame": i, "t_ms": round(i * 1000 / fps, 1), **cost.as_dict()}
+        if frame_wall_ms and i < len(frame_wall_ms):
+            row["wall_ms"] = round(frame_wall_ms[i], 3)
+        timeline.append(row)
+
+    return ProfileReport(
+        frames=len(per_frame),
+        fps=fps,
+        totals=totals.as_dict(),
+        elements=_ranked(elements.values()),
+        css_properties=_ranked(css.values()),
+        timers=_ranked(timers.values()),
+        timeline=timeline,
+    )
+
+
+def _describe_nodes(page: Any, node_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """Resolve backend node ids to selectors + expensive CSS via CDP (best effort)."""
+    cdp = page.context.new_cdp_session(page)
+    cdp.send("DOM.getDocument", {"depth": -1})
+    info: Dict[int, Dict[str, Any]] = {}
+    for node in node_ids:
+        try:
+            obj = cdp.send("DOM.resolveNode", {"backendNodeId": node})["object"]
+            res = cdp.send("Runtime.callFunctionOn", {
+                "objectId": obj["objectId"],
+                "functionDeclaration": _DESCRIBE_NODE_JS,
+                "returnByValue": True,
+            })
+            info[node] = res["result"]["value"]
+        except Exception:
+            continue  # Node removed from the DOM since it was painted
+    cdp.detach()
+    return info
+
+
+def profile_scene(
+    *,
+    html_path: Path,
+    out_dir: Path,
+    duration_ms: int,
+    fps: int = 30,
+    width: int = 1080,
+    height: int = 1920,
+    selector: str = ".shorts-container",
+) -> ProfileReport:
+    """Trace a deterministic playback of ``html_path`` and write the cost report.
+
+    Writes ``trace.json`` (open in chrome://tracing or DevTools), ``report.json`` and
+    ``timeline.csv`` to ``out_dir``.
+    """
+    import time
+
+    from playwright.sync_api import sync_playwright
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    frame_interval_ms = 1000 / fps
+    total_frames = int((duration_ms / 1000) * fps) + 1
+    frame_wall_ms: List[float] = []
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page(viewport={"width": width, "height": height})
+        load_scene(page, html_path, instrument_js=_INSTRUMENT_JS)
+        unscale_container(page, selector)  # Profile the full-size frame, not the preview
+        locator = page.locator(selector)
+        target = locator.first if locator.count() > 0 else page
+
+        browser.start_tracing(page=page, categories=TRACE_CATEGORIES)
+        for i in range(total_frames):
+            t0 = time.perf_counter()
+            page.evaluate(f"console.timeStamp('{FRAME_MARK}{i}'); window.__seekToTime({i * frame_interval_ms})")
+            target.screenshot()  # Forces paint + raster exactly like a real render
+            frame_wall_ms.append((time.perf_counter() - t0) * 1000)
+        trace = json.loads(browser.stop_tracing())
+        (out_dir / "trace.json").write_text(json.dumps(trace), encoding="utf-8")
+
+        timer_labels = page.evaluate("window.__shortsTimerLabels || {}")
+        events = normalize_events(trace)
+        totals, per_frame, per_node, timers = analyze_trace(events, timer_labels=timer_labels)
+        node_info = _describe_nodes(page, per_node)
+        browser.close()
+
+    report = build_report(
+        fps=fps,
+        totals=totals,
+        per_frame=per_frame,
+        per_node=per_node,
+        node_info=node_info,
+        timers=timers,
+        frame_wall_ms=frame_wall_ms,
+    )
+    (out_dir / "report.json").write_text(json.dumps(asdict(report), indent=2), encoding="utf-8")
+    with open(out_dir / "timeline.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["frame", "t_ms", *CATEGORIES, "total", "wall_ms"])
+        writer.writeheader()
+        writer.writerows(report.timeline)
+    return report
@@ -0,0 +1,106 @@
+"""Render manifest: checkpointed progress for resumable renders.
+
+The manifest lives in the run directory next to ``frames/`` and records what the
+render was asked to do (scene hash + parameters) and how far it got (captured
+frames + finished encode stages). ``render_mp4(resume=True)`` uses it to pick up
+where a crashed or pre-empted render stopped instead of starting from frame 0.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+MANIFEST_NAME = "render_manifest.json"
+MANIFEST_VERSION = 1
+
+# Parameters that change the captured pixels. A mismatch on any of these makes
+# previously captured frames unusable. ``duration_ms`` is deliberately absent:
+# frames are identical whatever the total length, so a longer render can reuse them.
+FRAME_PARAMS = ("fps", "width", "height", "selector")
+
+
+class RenderManifestError(ValueError):
+    """Raised when a manifest cannot be used to resume a render."""
+
+
+def sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+@dataclass
+class RenderManifest:
+    scene_sha256: str
+    params: Dict[str, Any]
+    total_frames: int
+    frames_done: int = 0  # Frames 0..frames_done-1 are on disk
+    stages: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # "encode"/"mux" -> details
+    version: int = MANIFEST_VERSION
+
+    @classmethod
+    def load(cls, path: Path) -> "RenderManifest":
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            raise RenderManifestError(f"No render manifest at {path}") from None
+        except json.JSONDecodeError as e:
+            raise RenderManifestError(f"Corrupt render manifest at {path}: {e}") from None
+        if data.get("version") != MANIFEST_VERSION:
+            raise RenderManifestError(
+                f"Unsupported manifest version {data.get('version')!r} (expected {MANIFEST_VERSION})"
+            )
+        return cls(
+            scene_sha256=data["scene_sha256"],
+            params=data["params"],
+            total_frames=data["total_frames"],
+            frames_done=data.get("frames_done", 0),
+            stages=data.get("stages", {}),
+        )
+
+    def save(self, path: Path) -> None:
+        """Write atomically so a crash mid-write never leaves a torn manifest."""
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(asdict(self), indent=2), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def validate(self, *, scene_sha256: str, params: Dict[str, Any]) -> None:
+        """Check that this manifest describes the same scene and frame settings."""
+        if self.scene_sha256 != scene_sha256:
+            raise RenderManifestError("Scene changed since the interrupted render; rerun without --resume")
+        for key in FRAME_PARAMS:
+            if self.params.get(key) != params.get(key):
+                raise RenderManifestError(
+                    f"Render parameter {key!r} changed ({self.params.get(key)!r} -> {params.get(key)!r}); "
+                    "rerun without --resume"
+                )
+
+    def first_missing_frame(self, frames_dir: Path) -> int:
+        """Index of the first frame that still has to be captured.
+
+        Trusts the manifest, but double-checks the files: anything deleted from
+        ``frames/`` since the checkpoint is captured again. Never past
+        ``total_frames`` (a resume may ask for a shorter render than was captured).
+        """
+        frames_done = min(self.frames_done, self.total_frames)
+        for i in range(frames_done):
+            if not (frames_dir / f"frame_{i:06d}.png").exists():
+                return i
+        return frames_done
+
+    def stage_done(self, name: str, **details: Any) -> bool:
+        stage: Optional[Dict[str, Any]] = self.stages.get(name)
+        return stage is not None and all(stage.get(k) == v for k, v in details.items())
+
+    def mark_stage(self, name: str, **details: Any) -> None:
+        self.stages[name] = details
+
+    def invalidate_stages(self, names: List[str]) -> None:
+        for name in names:
+            self.stages.pop(name, None)
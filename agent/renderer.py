@@ -1,10 +1,22 @@
 from __future__ import annotations
 
+import shutil
 import subprocess
+import sys
 import time
+from contextlib import ExitStack, contextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+from .render_manifest import MANIFEST_NAME, RenderManifest, sha256_file
+from .scene_server import (
+    DEFAULT_CACHE_DIR,
+    SceneServer,
+    acquire_profile_slot,
+    serve_root_for,
+    unreachable_references,
+)
 
 
 @dataclass(frozen=True)
@@ -21,14 +33,21 @@ class RenderResult:
     final_mp4_path: Optional[Path]  # After audio mux
 
 
-def ffmpeg_encode_cmd(*, fps: int, frame_glob: str, out_mp4: Path) -> List[str]:
+def ffmpeg_encode_cmd(
+    *, fps: int, frame_glob: str, out_mp4: Path, start_number: int = 0, frames: Optional[int] = None
+) -> List[str]:
+    start_args = ["-start_number", str(start_number)] if start_number else []
+    # Bound the encode: frames_dir may hold stale frames past the end of this render
+    frames_args = ["-frames:v", str(frames)] if frames is not None else []
     return [
         "ffmpeg",
         "-y",
         "-framerate",
         str(fps),
+        *start_args,
         "-i",
         frame_glob,
+        *frames_args,
         "-c:v",
         "libx264",
         "-pix_fmt",
@@ -54,6 +73,23 @@ def ffmpeg_mux_wav_cmd(*, in_mp4: Path, in_wav: Path, out_mp4: Path) -> List[str
     ]
 
 
+def ffmpeg_concat_cmd(*, list_file: Path, out_mp4: Path) -> List[str]:
+    """Join MP4 segments listed in an ffconcat file without re-encoding."""
+    return [
+        "ffmpeg",
+        "-y",
+        "-f",
+        "concat",
+        "-safe",
+        "0",
+        "-i",
+        str(list_file),
+        "-c",
+        "copy",
+        str(out_mp4),
+    ]
+
+
 def ffprobe_resolution(*, mp4_path: Path) -> str:
     cmd = [
         "ffprobe",
@@ -71,6 +107,215 @@ def ffprobe_resolution(*, mp4_path: Path) -> str:
     return out
 
 
+# Frame-stepping controller that works with CSS animations, setTimeout, AND requestAnimationFrame.
+# Also: pause + seek WAAPI animations deterministically per frame.
+VIRTUAL_CLOCK_JS = """
+    // Virtual time state
+    window.__virtualTime = 0;
+    window.__lastSeekTime = 0;
+    window.__timers = [];
+    window.__timerIdCounter = 1;
+    window.__rafCallbacks = new Map();
+    window.__rafIdCounter = 1;
+    window.__animStarts = new WeakMap(); // Animation -> start time (virtual ms)
+
+    // Override setTimeout to use virtual time
+    const __originalSetTimeout = window.setTimeout;
+    window.setTimeout = (callback, delay, ...args) => {
+        const id = window.__timerIdCounter++;
+        window.__timers.push({
+            id,
+            callback,
+            triggerTime: window.__virtualTime + (delay || 0),
+            args
+        });
+        return id;
+    };
+
+    // Override clearTimeout
+    const __originalClearTimeout = window.clearTimeout;
+    window.clearTimeout = (id) => {
+        window.__timers = window.__timers.filter(t => t.id !== id);
+    };
+
+    // Override requestAnimationFrame
+    const __originalRAF = window.requestAnimationFrame;
+    window.requestAnimationFrame = (callback) => {
+        const id = window.__rafIdCounter++;
+        window.__rafCallbacks.set(id, callback);
+        return id;
+    };
+
+    // Override cancelAnimationFrame
+    const __originalCAF = window.cancelAnimationFrame;
+    window.cancelAnimationFrame = (id) => {
+        window.__rafCallbacks.delete(id);
+    };
+
+    // Override Date.now and performance.now
+    const __originalDateNow = Date.now;
+    const __originalPerfNow = performance.now.bind(performance);
+    window.__realPerfNow = __originalPerfNow; // Wall clock, for profiling
+    Date.now = () => window.__virtualTime;
+    performance.now = () => window.__virtualTime;
+
+    // Function to seek to exact time
+    window.__seekToTime = (targetMs) => {
+        // Process time in small steps to fire timers in order
+        const stepSize = 1; // 1ms steps for accuracy
+
+        while (window.__virtualTime < targetMs) {
+            const nextTime = Math.min(window.__virtualTime + stepSize, targetMs);
+            window.__virtualTime = nextTime;
+
+            // Fire all timers that should have triggered
+            const dueTimers = window.__timers.filter(t => t.triggerTime <= nextTime);
+            window.__timers = window.__timers.filter(t => t.triggerTime > nextTime);
+            dueTimers.sort((a, b) => a.triggerTime - b.triggerTime);
+            dueTimers.forEach(t => {
+                try { t.callback(...t.args); } catch(e) { console.error(e); }
+            });
+        }
+
+        // Fire RAF callbacks once per seek (simulating one frame)
+        const rafCbs = Array.from(window.__rafCallbacks.values());
+        window.__rafCallbacks.clear();
+        rafCbs.forEach(cb => {
+            try { cb(window.__virtualTime); } catch(e) { console.error(e); }
+        });
+
+        // Pause + seek all animations (CSS animations + CSS transitions) deterministically.
+        // NOTE: Animation.currentTime is RELATIVE to when the animation started.
+        // We track a per-animation "start time" in virtual ms so we can seek correctly.
+        const anims = document.getAnimations({ subtree: true });
+        for (const anim of anims) {
+            try {
+                // Record an approximate "start time" the first moment we observe this anim.
+                // This becomes the reference for seeking currentTime.
+                if (!window.__animStarts.has(anim)) {
+                    window.__animStarts.set(anim, window.__virtualTime);
+                }
+                const startMs = window.__animStarts.get(anim) || 0;
+                const localT = Math.max(0, targetMs - startMs);
+                anim.pause();
+                anim.currentTime = localT;
+            } catch (e) {
+                // Some animations may be non-seekable; ignore.
+            }
+        }
+
+        window.__lastSeekTime = targetMs;
+    };
+"""
+
+
+@contextmanager
+def open_scene_page(
+    p: Any,
+    html_path: Path,
+    *,
+    width: int = 1080,
+    height: int = 1920,
+    serve: bool = True,
+    cache_dir: Optional[Path] = DEFAULT_CACHE_DIR,
+) -> Iterator[Tuple[Any, str]]:
+    """Launch Chromium (via Playwright instance ``p``) and yield ``(page, scene_url)``.
+
+    With ``serve`` the scene is loaded from a local ``SceneServer`` instead of a
+    ``file://`` URL, so Chromium's HTTP and code caches work. With ``cache_dir`` the
+    browser runs on a persistent profile slot under ``cache_dir/browser``, keeping
+    those caches warm across renders; ``None`` uses a throwaway profile. A scene that
+    references files the server root cannot hold (see ``unreachable_references``)
+    falls back to ``file://`` with a warning, rather than rendering with 404s.
+    """
+    root = serve_root_for(html_path) if serve else None
+    unreachable = unreachable_references(html_path, root) if root else []
+    if unreachable:
+        print(f"WARNING: {html_path} references files outside {root} ({', '.join(unreachable[:3])}); "
+              "loading it from file:// without the HTTP cache", file=sys.stderr)
+        serve = False
+    with ExitStack() as stack:
+        slot = stack.enter_context(acquire_profile_slot(cache_dir / "browser")) if cache_dir else None
+        if serve:
+            server = stack.enter_context(SceneServer(
+                root,
+                port=slot.port if slot else 0,
+                # Optimized variants sit next to the scenes, wherever the browser cache is
+                immutable_dirs=[root / ".cache" / "assets"],
+            ))
+            url = server.url_for(html_path)
+        else:
+            url = html_path.resolve().as_uri()
+        
+        viewport = {"width": width, "height": height}
+        if slot:
+            context = p.chromium.launch_persistent_context(str(slot.profile_dir), headless=True, viewport=viewport)
+            stack.callback(context.close)
+            page = context.pages[0] if context.pages else context.new_page()
+            if serve:
+                # Keep the caches, but never let page state from an earlier render leak in
+                cdp = context.new_cdp_session(page)
+                cdp.send("Storage.clearDataForOrigin", {
+                    "origin": server.base_url,
+                    "storageTypes": "cookies,local_storage,indexeddb,websql,service_workers,cache_storage,file_systems",
+                })
+                cdp.detach()
+        else:
+            browser = p.chromium.launch(headless=True)
+            stack.callback(browser.close)
+            page = browser.new_page(viewport=viewport)
+        yield page, url
+
+
+def load_scene(page: Any, html_path: Path, *, instrument_js: Optional[str] = None, url: Optional[str] = None) -> None:
+    """Load a scene into a Playwright page under the virtual clock and start it.
+
+    After this returns the page is at virtual time 0 with ``__shortsPlayAll`` called;
+    drive it with ``window.__seekToTime(ms)``. ``instrument_js`` runs after the
+    clock is installed but before the scene starts (e.g. to wrap its timers).
+    ``url`` overrides where ``html_path`` is loaded from (see ``open_scene_page``).
+    """
+    # Set render mode flag BEFORE page scripts run (prevents auto-play on load)
+    page.add_init_script("window.__RENDER_MODE__ = true;")
+    
+    # Load HTML file
+    page.goto(url or html_path.resolve().as_uri())
+    page.wait_for_load_state("networkidle")
+    # Web fonts must be decoded before the first frame (otherwise frame 0 uses fallbacks)
+    page.evaluate("document.fonts.ready.then(() => true)")
+    
+    page.evaluate(VIRTUAL_CLOCK_JS)
+    if instrument_js:
+        page.evaluate(instrument_js)
+    
+    # Start animation via __shortsPlayAll if it exists
+    # This triggers the setTimeout chain that shows/hides elements
+    has_play_fn = page.evaluate("typeof window.__shortsPlayAll === 'function'")
+    if has_play_fn:
+        page.evaluate("window.__shortsPlayAll()")
+    else:
+        # Fallback: try clicking Play All button
+        play_btn = page.locator("text=Play All")
+        if play_btn.count() > 0:
+            play_btn.first.click()
+
+
+def unscale_container(page: Any, selector: str = ".shorts-container") -> None:
+    """Undo the container's preview ``transform: scale(...)`` so it is laid out,
+    painted and measured at its true 1080x1920 size, as in the final video."""
+    page.evaluate(
+        """
+        (sel) => {
+          const el = document.querySelector(sel);
+          if (!el) return;
+          el.style.transform = 'none';
+          el.style.transformOrigin = 'top left';
+        }
+        """,
+        selector,
+    )
+
+
 def capture_frames_playwright(
     *,
     html_path: Path,
@@ -80,6 +325,13 @@ def capture_frames_playwright(
     width: int = 1080,
     height: int = 1920,
     selector: str = ".shorts-container",
+    start_frame: int = 0,
+    end_frame: Optional[int] = None,
+    on_frame: Optional[Callable[[int], None]] = None,
+    before_frame: Optional[Callable[[Any, int, float], None]] = None,
+    extend_duration_ms: Optional[Callable[[], int]] = None,
+    serve: bool = True,
+    cache_dir: Optional[Path] = DEFAULT_CACHE_DIR,
 ) -> int:
     """Capture frames from HTML animation using Playwright with deterministic timing.
 
@@ -91,7 +343,22 @@ def capture_frames_playwright(
     This avoids relying on real-time sleeps (which can make 60/120fps captures look
     identical to 30fps when animations get clamped to their end states).
 
-    Returns the number of frames captured.
+    Resuming: with ``start_frame > 0`` the virtual clock is fast-forwarded through
+    every earlier frame time (same seeks, no screenshots) so animation start times
+    are recorded exactly as in an uninterrupted run, then capture continues from
+    ``start_frame``. ``on_frame(i)`` is called after frame ``i`` is on disk.
+    ``end_frame`` (exclusive) stops early, e.g. to capture one segment of a render.
+
+    Streaming inputs: ``before_frame(page, i, t_ms)`` runs before frame ``i`` is
+    seeked (it may block, e.g. until voiceover timestamps up to ``t_ms`` are known,
+    and may update the page). ``extend_duration_ms()`` is called once the first
+    ``duration_ms`` worth of frames is captured; if it returns a longer duration,
+    capture continues in the same browser session up to it.
+
+    ``serve`` / ``cache_dir``: load the scene over a local caching HTTP server with a
+    persistent browser profile (see ``open_scene_page``).
+
+    Returns the total number of frames in the render (including skipped ones).
     """
     from playwright.sync_api import sync_playwright
     
@@ -100,127 +367,10 @@ def capture_frames_playwright(
     frame_interval_ms = 1000 / fps
     total_frames = int((duration_ms / 1000) * fps) + 1
     
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page(viewport={"width": width, "height": height})
-        
-        # Set render mode flag BEFORE page scripts run (prevents auto-play on load)
-        page.add_init_script("window.__RENDER_MODE__ = true;")
-        
-        # Load HTML file
-        page.goto(f"file://{html_path.resolve()}")
-        page.wait_for_load_state("networkidle")
-        
-        # Inject frame-stepping controller that works with CSS animations, setTimeout, AND requestAnimationFrame.
-        # Also: pause + seek WAAPI animations deterministically per frame.
-        page.evaluate("""
-            // Virtual time state
-            window.__virtualTime = 0;
-            window.__lastSeekTime = 0;
-            window.__timers = [];
-            window.__timerIdCounter = 1;
-            window.__rafCallbacks = new Map();
-            window.__rafIdCounter = 1;
-            window.__animStarts = new WeakMap(); // Animation -> start time (virtual ms)
-            
-            // Override setTimeout to use virtual time
-            const __originalSetTimeout = window.setTimeout;
-            window.setTimeout = (callback, delay, ...args) => {
-                const id = window.__timerIdCounter++;
-                window.__timers.push({
-                    id,
-                    callback,
-                    triggerTime: window.__virtualTime + (delay || 0),
-                    args
-                });
-                return id;
-            };
-            
-            // Override clearTimeout
-            const __originalClearTimeout = window.clearTimeout;
-            window.clearTimeout = (id) => {
-                window.__timers = window.__timers.filter(t => t.id !== id);
-            };
-            
-            // Override requestAnimationFrame
-            const __originalRAF = window.requestAnimationFrame;
-            window.requestAnimationFrame = (callback) => {
-                const id = window.__rafIdCounter++;
-                window.__rafCallbacks.set(id, callback);
-                return id;
-            };
-            
-            // Override cancelAnimationFrame
-            const __originalCAF = window.cancelAnimationFrame;
-            window.cancelAnimationFrame = (id) => {
-                window.__rafCallbacks.delete(id);
-            };
-            
-            // Override Date.now and performance.now
-            const __originalDateNow = Date.now;
-            const __originalPerfNow = performance.now.bind(performance);
-            Date.now = () => window.__virtualTime;
-            performance.now = () => window.__virtualTime;
-            
-            // Function to seek to exact time
-            window.__seekToTime = (targetMs) => {
-                // Process time in small steps to fire timers in order
-                const stepSize = 1; // 1ms steps for accuracy
-                
-                while (window.__virtualTime < targetMs) {
-                    const nextTime = Math.min(window.__virtualTime + stepSize, targetMs);
-                    window.__virtualTime = nextTime;
-                    
-                    // Fire all timers that should have triggered
-                    const dueTimers = window.__timers.filter(t => t.triggerTime <= nextTime);
-                    window.__timers = window.__timers.filter(t => t.triggerTime > nextTime);
-                    dueTimers.sort((a, b) => a.triggerTime - b.triggerTime);
-                    dueTimers.forEach(t => {
-                        try { t.callback(...t.args); } catch(e) { console.error(e); }
-                    });
-                }
-                
-                // Fire RAF callbacks once per seek (simulating one frame)
-                const rafCbs = Array.from(window.__rafCallbacks.values());
-                window.__rafCallbacks.clear();
-                rafCbs.forEach(cb => {
-                    try { cb(window.__virtualTime); } catch(e) { console.error(e); }
-                });
-                
-                // Pause + seek all animations (CSS animations + CSS transitions) deterministically.
-                // NOTE: Animation.currentTime is RELATIVE to when the animation started.
-                // We track a per-animation "start time" in virtual ms so we can seek correctly.
-                const anims = document.getAnimations({ subtree: true });
-                for (const anim of anims) {
-                    try {
-                        // Record an approximate "start time" the first moment we observe this anim.
-                        // This becomes the reference for seeking currentTime.
-                        if (!window.__animStarts.has(anim)) {
-                            window.__animStarts.set(anim, window.__virtualTime);
-                        }
-                        const startMs = window.__animStarts.get(anim) || 0;
-                        const localT = Math.max(0, targetMs - startMs);
-                        anim.pause();
-                        anim.currentTime = localT;
-                    } catch (e) {
-                        // Some animations may be non-seekable; ignore.
-                    }
-                }
-                
-                window.__lastSeekTime = targetMs;
-            };
-        """)
-        
-        # Start animation via __shortsPlayAll if it exists
-        # This triggers the setTimeout chain that shows/hides elements
-        has_play_fn = page.evaluate("typeof window.__shortsPlayAll === 'function'")
-        if has_play_fn:
-            page.evaluate("window.__shortsPlayAll()")
-        else:
-            # Fallback: try clicking Play All button
-            play_btn = page.locator("text=Play All")
-            if play_btn.count() > 0:
-                play_btn.first.click()
+    with sync_playwright() as p, open_scene_page(
+        p, html_path, width=width, height=height, serve=serve, cache_dir=cache_dir
+    ) as (page, url):
+        load_scene(page, html_path, url=url)
         
         # Prefer capturing only the animation container (not the whole DOM/page UI).
         # Fall back to full-page screenshots if selector isn't found.
@@ -229,24 +379,21 @@ def capture_frames_playwright(
         if use_locator:
             # Ensure stable bounding box (wait for it to exist)
             locator.first.wait_for(state="visible", timeout=10_000)
-            # Ensure the container is captured at the true 1080x1920 size.
-            page.evaluate(
-                """
-                (sel) => {
-                  const el = document.querySelector(sel);
-                  if (!el) return;
-                  el.style.transform = 'none';
-                  el.style.transformOrigin = 'top left';
-                }
-                """,
-                selector,
-            )
+        unscale_container(page, selector)
+
+        # Fast-forward to the first missing frame. Seeking frame by frame (rather than
+        # jumping straight to the target) keeps __animStarts identical to a full run.
+        for i in range(min(start_frame, total_frames)):
+            page.evaluate(f"window.__seekToTime({i * frame_interval_ms})")
 
         # Capture frames by stepping through virtual time and deterministically seeking animations.
-        for i in range(total_frames):
+        def _capture(i: int) -> None:
             frame_path = frames_dir / f"frame_{i:06d}.png"
             target_time_ms = i * frame_interval_ms
             
+            if before_frame:
+                before_frame(page, i, target_time_ms)
+            
             # Advance virtual time to fire setTimeout callbacks (which add animation classes)
             page.evaluate(f"window.__seekToTime({target_time_ms})")
             
@@ -254,8 +401,19 @@ def capture_frames_playwright(
                 locator.first.screenshot(path=str(frame_path))
             else:
                 page.screenshot(path=str(frame_path))
+            
+            if on_frame:
+                on_frame(i)
         
-        browser.close()
+        stop_frame = total_frames if end_frame is None else min(end_frame, total_frames)
+        for i in range(start_frame, stop_frame):
+            _capture(i)
+        
+        if extend_duration_ms and end_frame is None:
+            extended_frames = int((extend_duration_ms() / 1000) * fps) + 1
+            for i in range(max(start_frame, total_frames), extended_frames):
+                _capture(i)
+            total_frames = max(total_frames, extended_frames)
     
     return total_frames
 
@@ -267,37 +425,108 @@ def render_mp4(
     duration_ms: int,
     fps: int = 30,
     wav_path: Optional[Path] = None,
+    resume: bool = False,
+    width: int = 1080,
+    height: int = 1920,
+    selector: str = ".shorts-container",
+    before_frame: Optional[Callable[[Any, int, float], None]] = None,
+    extend_duration_ms: Optional[Callable[[], int]] = None,
+    serve: bool = True,
+    cache_dir: Optional[Path] = DEFAULT_CACHE_DIR,
 ) -> RenderResult:
-    """Full render pipeline: capture frames -> encode MP4 -> optionally mux audio."""
+    """Full render pipeline: capture frames -> encode MP4 -> optionally mux audio.
+
+    Progress is checkpointed to ``render_manifest.json`` in ``output_dir``. With
+    ``resume=True`` the manifest is validated against the scene and parameters and
+    the render continues from the first missing frame / unfinished stage; a
+    mismatch raises ``RenderManifestError``.
+
+    ``before_frame`` / ``extend_duration_ms`` / ``serve`` / ``cache_dir`` are passed
+    to the capture step (see ``capture_frames_playwright``); ``wav_path`` only has to exist by the time
+    capture finishes, so audio can still be generating while frames are captured.
+    """
     
     frames_dir = output_dir / "frames"
     mp4_path = output_dir / "video.mp4"
     
-    # Step 1: Capture frames
-    frame_count = capture_frames_playwright(
-        html_path=html_path,
-        frames_dir=frames_dir,
-        duration_ms=duration_ms,
-        fps=fps,
-    )
+    manifest_path = output_dir / MANIFEST_NAME
+    scene_sha256 = sha256_file(html_path)
+    params = {"duration_ms": duration_ms, "fps": fps, "width": width, "height": height, "selector": selector}
+    total_frames = int((duration_ms / 1000) * fps) + 1
+    
+    start_frame = 0
+    if resume:
+        manifest = RenderManifest.load(manifest_path)
+        manifest.validate(scene_sha256=scene_sha256, params=params)
+        if manifest.total_frames != total_frames:
+            manifest.invalidate_stages(["encode", "mux"])
+        manifest.params = params
+        manifest.total_frames = total_frames
+        start_frame = manifest.first_missing_frame(frames_dir)
+        manifest.frames_done = start_frame
+    else:
+        manifest = RenderManifest(scene_sha256=scene_sha256, params=params, total_frames=total_frames)
+        # A fresh manifest must not sit next to frames from an older (longer) render
+        shutil.rmtree(frames_dir, ignore_errors=True)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest.save(manifest_path)
+    
+    # Step 1: Capture frames (checkpoint roughly once per second of video)
+    if start_frame < total_frames:
+        manifest.invalidate_stages(["encode", "mux"])
+        
+        def _checkpoint(i: int) -> None:
+            manifest.frames_done = i + 1
+            if manifest.frames_done % fps == 0:
+                manifest.save(manifest_path)
+        
+        def _extend() -> int:
+            extended_ms = max(duration_ms, extend_duration_ms())
+            manifest.params["duration_ms"] = extended_ms
+            manifest.total_frames = max(manifest.total_frames, int((extended_ms / 1000) * fps) + 1)
+            return extended_ms
+        
+        total_frames = capture_frames_playwright(
+            html_path=html_path,
+            frames_dir=frames_dir,
+            duration_ms=duration_ms,
+            fps=fps,
+            width=width,
+            height=height,
+            selector=selector,
+            start_frame=start_frame,
+            on_frame=_checkpoint,
+            before_frame=before_frame,
+            extend_duration_ms=_extend if extend_duration_ms else None,
+            serve=serve,
+            cache_dir=cache_dir,
+        )
+        manifest.frames_done = total_frames
+        manifest.save(manifest_path)
     
     # Step 2: Encode MP4
-    frame_glob = str(frames_dir / "frame_%06d.png")
-    encode_cmd = ffmpeg_encode_cmd(fps=fps, frame_glob=frame_glob, out_mp4=mp4_path)
-    subprocess.run(encode_cmd, check=True, capture_output=True)
+    if not (manifest.stage_done("encode", frames=total_frames) and mp4_path.exists()):
+        manifest.invalidate_stages(["mux"])
+        frame_glob = str(frames_dir / "frame_%06d.png")
+        encode_cmd = ffmpeg_encode_cmd(fps=fps, frame_glob=frame_glob, out_mp4=mp4_path, frames=total_frames)
+        subprocess.run(encode_cmd, check=True, capture_output=True)
+        manifest.mark_stage("encode", frames=total_frames)
+        manifest.save(manifest_path)
     
     # Step 3: Mux audio if provided
     final_mp4_path: Optional[Path] = None
     if wav_path and wav_path.exists():
         final_mp4_path = output_dir / "final.mp4"
-        mux_cmd = ffmpeg_mux_wav_cmd(in_mp4=mp4_path, in_wav=wav_path, out_mp4=final_mp4_path)
-        subprocess.run(mux_cmd, check=True, capture_output=True)
+        wav_sha256 = sha256_file(wav_path)
+        if not (manifest.stage_done("mux", wav_sha256=wav_sha256) and final_mp4_path.exists()):
+            mux_cmd = ffmpeg_mux_wav_cmd(in_mp4=mp4_path, in_wav=wav_path, out_mp4=final_mp4_path)
+            subprocess.run(mux_cmd, check=True, capture_output=True)
+            manifest.mark_stage("mux", wav_sha256=wav_sha256)
+            manifest.save(manifest_path)
     
     return RenderResult(
         frames_dir=frames_dir,
-        frame_count=frame_count,
+        frame_count=total_frames,
         mp4_path=mp4_path,
         final_mp4_path=final_mp4_path,
     )
-
-
@@ -0,0 +1,275 @@
+"""Local static HTTP server for scenes, plus persistent browser profile slots.
+
+Chromium barely caches ``file://`` loads: every render re-reads, re-parses and
+re-compiles the same shared CSS/JS and re-decodes the same images. Serving the
+scene from ``http://127.0.0.1`` with validators (strong ETags) and running the
+browser on a persistent profile lets repeat renders revalidate with a cheap 304
+and reuse the HTTP cache and V8's code cache.
+
+- ``SceneServer`` serves one root directory (the Shorts dir, so a run's
+  ``../../assets/...`` references resolve exactly as they do on disk; a scene whose
+  references leave the root is loaded from ``file://`` instead). Documents,
+  scripts and styles are ``no-cache`` (always revalidated, so edits show up on the
+  next render); files under content-hashed dirs are ``immutable``.
+- ``acquire_profile_slot`` hands out one of a few profile directories under
+  ``.cache/browser``, each with its own server port. A Chromium profile cannot be
+  shared by two browsers, so parallel renders take different slots; the port is
+  fixed per slot because the HTTP cache is keyed by origin.
+
+Hidden files and directories (``.env``, ``.git``, ``.cache/browser``) are never
+served, except inside ``immutable_dirs`` (``.cache/assets``, the optimized asset
+variants).
+"""
+from __future__ import annotations
+
+import hashlib
+import mimetypes
+import os
+import re
+import shutil
+import threading
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import quote, unquote, urlparse
+
+SHORTS_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_CACHE_DIR = SHORTS_DIR / ".cache"
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+
+def serve_root_for(html_path: Path) -> Path:
+    """Directory to serve for a scene, chosen so its relative references resolve.
+
+    The Shorts dir if the scene lives in it; the Shorts dir of another checkout (or
+    a shared mount) for ``<shorts>/runs/<id>/scene.html``; else the scene's own dir.
+    """
+    html_path = html_path.resolve()
+    if html_path.is_relative_to(SHORTS_DIR):
+        return SHORTS_DIR
+    if html_path.parent.parent.name == "runs":
+        return html_path.parent.parent.parent
+    return html_path.parent
+
+
+_REF_RE = re.compile(r"""(?:\b(?:src|href)\s*=\s*["']|url\(\s*["']?)([^"')]+)""")
+
+
+def unreachable_references(html_path: Path, root: Path) -> List[str]:
+    """Static references in the scene that a server rooted at ``root`` would 404.
+
+    That is ``file:`` URLs, absolute paths and relative paths leaving ``root``;
+    they load under ``file://`` but not over HTTP.
+    """
+    html_path = html_path.resolve()
+    root = root.resolve()
+    unreachable = []
+    for ref in _REF_RE.findall(html_path.read_text(encoding="utf-8", errors="replace")):
+        ref = ref.strip()
+        if not ref or ref.startswith("#") or (re.match(r"^[a-z][a-z0-9+.-]*:", ref) and not ref.startswith("file:")):
+            continue  # Same-document, http(s):, data:, ...
+        path = unquote(urlparse(ref).path)
+        if ref.startswith("file:") or path.startswith("/") or not (html_path.parent / path).resolve().is_relative_to(root):
+            unreachable.append(ref)
+    return unreachable
+
+
+@dataclass
+class SceneServerStats:
+    requests: int = 0
+    not_modified: int = 0
+    bytes_sent: int = 0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_Server"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_HEAD(self) -> None:
+        self._serve(body=False)
+
+    def do_GET(self) -> None:
+        self._serve(body=True)
+
+    def _serve(self, *, body: bool) -> None:
+        with self.server.lock:
+            self.server.stats.requests += 1
+        path = self.server.resolve(urlparse(self.path).path)
+        if path is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        stat = path.stat()
+        etag = self.server.etag(path, stat)
+        cache_control = IMMUTABLE if self.server.is_immutable(path) else REVALIDATE
+        if etag in (t.strip() for t in self.headers.get("If-None-Match", "").split(",")):
+            with self.server.lock:
+                self.server.stats.not_modified += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", cache_control)
+            self.end_headers()
+            return
+
+        content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        if content_type.startswith("text/") or content_type.endswith(("javascript", "json", "svg+xml")):
+            content_type += "; charset=utf-8"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(stat.st_size))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", cache_control)
+        self.end_headers()
+        if body:
+            with open(path, "rb") as f:
+                shutil.copyfileobj(f, self.wfile)
+            with self.server.lock:
+                self.server.stats.bytes_sent += stat.st_size
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], root: Path, immutable_dirs: Sequence[Path]) -> None:
+        super().__init__(address, _Handler)
+        self.root = root
+        self.immutable_dirs = [d.resolve() for d in immutable_dirs]
+        self.stats = SceneServerStats()
+        self.lock = threading.Lock()
+        self._etags: Dict[Path, Tuple[int, int, str]] = {}
+
+    def resolve(self, url_path: str) -> Optional[Path]:
+        """Map a URL path to a file under the root, or None (404)."""
+        parts = [p for p in unquote(url_path).split("/") if p not in ("", ".")]
+        if ".." in parts:
+            return None
+        path = self.root.joinpath(*parts).resolve()
+        if not path.is_relative_to(self.root) or not path.is_file():
+            return None
+        hidden = any(p.startswith(".") for p in (*parts, *path.relative_to(self.root).parts))
+        if hidden and not self.is_immutable(path):
+            return None  # Browser profiles (cookies!) live under .cache too
+        return path
+
+    def etag(self, path: Path, stat: os.stat_result) -> str:
+        """Strong ETag from the file content, re-hashed only when size/mtime change."""
+        with self.lock:
+            cached = self._etags.get(path)
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        etag = f'"{h.hexdigest()[:32]}"'
+        with self.lock:
+            self._etags[path] = (stat.st_mtime_ns, stat.st_size, etag)
+        return etag
+
+    def is_immutable(self, path: Path) -> bool:
+        return any(path.is_relative_to(d) for d in self.immutable_dirs)
+
+
+class SceneServer:
+    """Serve ``root`` on a background thread::
+
+        with SceneServer(serve_root_for(html_path)) as server:
+            page.goto(server.url_for(html_path))
+
+    If ``port`` is taken, a free port is used instead (correct, but the browser's
+    cache for the usual origin is not reused).
+    """
+
+    def __init__(self, root: Path, *, host: str = "127.0.0.1", port: int = 0,
+                 immutable_dirs: Sequence[Path] = ()) -> None:
+        self.root = root.resolve()
+        try:
+            self._server = _Server((host, port), self.root, immutable_dirs)
+        except OSError:
+            if not port:
+                raise
+            self._server = _Server((host, 0), self.root, immutable_dirs)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def stats(self) -> SceneServerStats:
+        return self._server.stats
+
+    def url_for(self, path: Path) -> str:
+        """URL of a file under the root (ValueError if it is outside)."""
+        rel = path.resolve().relative_to(self.root)
+        return f"{self.base_url}/{quote(rel.as_posix())}"
+
+    def start(self) -> "SceneServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="scene-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "SceneServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+@dataclass(frozen=True)
+class ProfileSlot:
+    profile_dir: Path
+    port: int  # Scene server port paired with this profile (stable origin -> cache hits)
+
+
+def _port_base(root: Path) -> int:
+    # Spread different checkouts/cache dirs over 20000-51999 in blocks of 16
+    return 20000 + (zlib.crc32(str(root.resolve()).encode()) % 2000) * 16
+
+
+@contextmanager
+def acquire_profile_slot(root: Path, *, max_slots: int = 8) -> Iterator[Optional[ProfileSlot]]:
+    """Lock the first free persistent profile under ``root`` for the duration.
+
+    Yields None when every slot is busy or the platform has no ``fcntl`` (callers
+    then use a throwaway profile). Locks are released if the process dies.
+    """
+    try:
+        import fcntl
+    except ImportError:  # Windows
+        yield None
+        return
+
+    root.mkdir(parents=True, exist_ok=True)
+    base = _port_base(root)
+    for n in range(min(max_slots, 16)):
+        lock = open(root / f"profile-{n}.lock", "a")
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock.close()
+            continue
+        try:
+            yield ProfileSlot(profile_dir=root / f"profile-{n}", port=base + n)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+            lock.close()
+        return
+    yield None
@@ -0,0 +1,71 @@
+from pathlib import Path
+
+import pytest
+
+from agent.assets import _COLLECT_JS, AssetVariant, draw_scale, make_variant, rewrite_references, sample_draws
+
+
+def test_draw_scale_fit_modes():
+    assert draw_scale("cover", 300, 100, 1000, 1000) == pytest.approx(0.3)
+    assert draw_scale("contain", 300, 100, 1000, 1000) == pytest.approx(0.1)
+    assert draw_scale("auto", 300, 100, 1000, 1000) == 1.0
+    assert draw_scale("500px auto", 300, 100, 1000, 1000) == pytest.approx(0.5)
+    assert draw_scale("200% 50%", 300, 100, 1000, 1000) == pytest.approx(0.6)
+
+
+class _ScaledScenePage:
+    """A loaded scene whose container sits at the templates' preview scale(0.4)."""
+
+    def __init__(self, logo: Path) -> None:
+        self.logo = logo
+        self.scale = 0.4
+
+    def evaluate(self, script: str, arg=None):
+        if "transform = 'none'" in script:
+            self.scale = 1.0
+        elif script == _COLLECT_JS:
+            # A full-bleed 1080x1920 <img> with object-fit: cover
+            return [{"url": self.logo.as_uri(), "w": 1080 * self.scale, "h": 1920 * self.scale, "fit": "cover"}]
+
+
+def test_sample_draws_measures_inside_scaled_container_at_full_size(tmp_path: Path):
+    logo = tmp_path / "bg.png"
+    draws = sample_draws(_ScaledScenePage(logo), duration_ms=200, sample_fps=10)
+
+    assert draws == {logo.resolve(): [("cover", 1080.0, 1920.0)]}
+    fit, w, h = draws[logo.resolve()][0]
+    assert draw_scale(fit, w, h, 2160, 3840) == pytest.approx(0.5)  # Not 0.2
+
+
+def test_rewrite_references(tmp_path: Path):
+    run_dir = tmp_path / "runs" / "x"
+    run_dir.mkdir(parents=True)
+    logo = tmp_path / "assets" / "logo.png"
+    cached = tmp_path / ".cache" / "assets" / "logo-abc.webp"
+    variant = AssetVariant(
+        source=logo.resolve(), path=cached, width=10, height=10,
+        source_width=100, source_height=100, source_bytes=1000, bytes=100,
+    )
+    html = (
+        '<img src="../../assets/logo.png"><img src="https://x.test/logo.png">'
+        "<div style=\"background: url('../../assets/logo.png')\"></div>"
+    )
+
+    out = rewrite_references(html, run_dir.resolve(), {logo.resolve(): variant})
+
+    assert out.count("../../.cache/assets/logo-abc.webp") == 2
+    assert "https://x.test/logo.png" in out
+
+
+def test_make_variant_downsizes_and_caches(tmp_path: Path):
+    Image = pytest.importorskip("PIL.Image")
+    src = tmp_path / "big.png"
+    Image.new("RGB", (400, 200), (200, 30, 30)).save(src)
+
+    variant = make_variant(src, scale=0.25, cache_dir=tmp_path / "cache", fmt="png")
+
+    assert (variant.width, variant.height) == (100, 50)
+    with Image.open(variant.path) as img:
+        assert img.size == (100, 50)
+    again = make_variant(src, scale=0.25, cache_dir=tmp_path / "cache", fmt="png")
+    assert again.path == variant.path
@@ -0,0 +1,64 @@
+import wave
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from agent.audio import integrated_loudness, process_wav, read_audio_info, write_audio_info
+from agent.cartesia_tts import WordTimestamp
+
+RATE = 16000
+
+
+def _write_tone_wav(path: Path, *, lead_ms: int, tone_ms: int, tail_ms: int, amplitude: float) -> None:
+    t = np.arange(int(tone_ms * RATE / 1000)) / RATE
+    tone = amplitude * np.sin(2 * np.pi * 220 * t)
+    samples = np.concatenate([np.zeros(lead_ms * RATE // 1000), tone, np.zeros(tail_ms * RATE // 1000)])
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(RATE)
+        w.writeframes((samples * 32767).astype("<i2").tobytes())
+
+
+def test_process_wav_trims_and_realigns_words(tmp_path: Path):
+    wav = tmp_path / "a.wav"
+    _write_tone_wav(wav, lead_ms=500, tone_ms=1000, tail_ms=700, amplitude=0.1)
+    words = [
+        WordTimestamp(word="Hello.", start_ms=500, end_ms=1000),
+        WordTimestamp(word="World", start_ms=1000, end_ms=1500),
+    ]
+
+    info, aligned = process_wav(wav, words, margin_ms=0, target_lufs=None, sentence_pause_ms=200)
+
+    assert info.trim_start_ms == 500
+    assert info.trim_end_ms == 700
+    assert info.duration_ms == 1200
+    assert [(w.start_ms, w.end_ms) for w in aligned] == [(0, 500), (700, 1200)]
+    with wave.open(str(wav), "rb") as w:
+        assert w.getnframes() == 1200 * RATE // 1000
+
+
+def test_process_wav_normalizes_loudness(tmp_path: Path):
+    wav = tmp_path / "a.wav"
+    _write_tone_wav(wav, lead_ms=0, tone_ms=2000, tail_ms=0, amplitude=0.05)
+
+    info, _ = process_wav(wav, [], target_lufs=-20.0, peak_ceiling_db=0.0)
+
+    from agent.audio import read_wav_memmap
+    pcm, rate = read_wav_memmap(wav)
+    measured = integrated_loudness(pcm.astype(np.float32) / 32768.0, rate)
+    assert measured == pytest.approx(-20.0, abs=0.1)
+    assert info.gain_db > 0
+
+
+def test_audio_info_detects_stale_wav(tmp_path: Path):
+    wav = tmp_path / "a.wav"
+    _write_tone_wav(wav, lead_ms=0, tone_ms=100, tail_ms=0, amplitude=0.1)
+    info, _ = process_wav(wav, [], target_lufs=None)
+    write_audio_info(tmp_path / "audio.json", info)
+
+    assert read_audio_info(tmp_path / "audio.json", wav_path=wav) == info
+    wav.write_bytes(wav.read_bytes() + b"\0\0")
+    assert read_audio_info(tmp_path / "audio.json", wav_path=wav) is None
@@ -0,0 +1,44 @@
+import json
+import re
+import shutil
+import subprocess
+
+import pytest
+
+from agent.debug_overlay import inject_debug_overlay
+
+# Just enough of a browser for the overlay script, with a controllable clock
+_DOM_JS = """
+let start = 10000, now = start, frame = null;
+const els = {};
+const window = {};
+const document = {getElementById: (id) => (els[id] = els[id] || {textContent: ""})};
+Date.now = () => now;
+const requestAnimationFrame = (cb) => { frame = cb; };
+const tick = (ms) => { now = start + ms; const cb = frame; frame = null; if (cb) cb(); return els.debugScript.textContent; };
+"""
+
+
+def _run_overlay(segments, driver_js: str):
+    node = shutil.which("node")
+    if node is None:
+        pytest.skip("node not installed")
+    html = inject_debug_overlay("<body></body>", segments)
+    script = re.search(r"<script>(.*)</script>", html, re.S).group(1)
+    out = subprocess.run([node, "-e", _DOM_JS + script + driver_js], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+
+def test_set_voiceover_replaces_segments_after_load():
+    segments = [{"start_ms": 0, "end_ms": 1000, "text": "hello"}, {"start_ms": 1000, "end_ms": 2000, "text": "world"}]
+    shown = _run_overlay([], """
+        window.__shortsPlayAll();
+        const out = [els.debugScript.textContent];
+        window.__shortsSetVoiceover(%s);
+        out.push(tick(500), tick(1500), tick(3900), frame !== null, tick(4100), frame !== null);
+        console.log(JSON.stringify(out));
+    """ % json.dumps(segments))
+
+    # Nothing to show until segments arrive; then they drive the text, and the overlay
+    # stops redrawing 2s after the *new* last segment (not the 30s placeholder)
+    assert shown == ["—", '"hello"', '"world"', "—", True, "—", False]
@@ -0,0 +1,100 @@
+import os
+from pathlib import Path
+
+import agent.distributed as distributed
+from agent.distributed import RenderJob, WorkQueue
+
+JOB = RenderJob(job_id="demo-1", html_path="/shared/runs/demo/scene_render.html", duration_ms=1000, fps=30)
+
+
+def _age(path: Path, seconds: float) -> None:
+    t = path.stat().st_mtime - seconds
+    os.utime(path, (t, t))
+
+
+def test_submit_splits_frames_into_contiguous_segments(tmp_path: Path):
+    queue = WorkQueue(tmp_path)
+    tasks = queue.submit(JOB, segment_frames=10)
+
+    assert [(t.start_frame, t.end_frame) for t in tasks] == [(0, 10), (10, 20), (20, 30), (30, 31)]
+    assert queue.tasks(JOB.job_id) == tasks
+    assert queue.load_job(JOB.job_id) == JOB
+
+
+def test_claims_are_exclusive_and_completion_is_final(tmp_path: Path):
+    queue = WorkQueue(tmp_path)
+    queue.submit(JOB, segment_frames=20)
+
+    a = queue.claim("a")
+    b = queue.claim("b")
+    assert a.task.task_id != b.task.task_id
+    assert queue.claim("c") is None  # Both tasks taken
+
+    assert queue.complete(a, queue.segment_path(a))
+    assert queue.status(JOB.job_id) == {"tasks": 2, "done": 1, "running": 1, "failed": 0}
+    assert queue.claim("c") is None  # Finished tasks are never handed out again
+
+
+def test_stale_claim_is_reassigned_and_old_owner_cannot_complete(tmp_path: Path):
+    queue = WorkQueue(tmp_path, stale_after_s=30)
+    queue.submit(JOB, segment_frames=100)
+
+    slow = queue.claim("slow")
+    assert queue.heartbeat(slow)
+    assert queue.reap_stale(JOB.job_id) == []
+
+    _age(slow.lock_path, 60)
+    fast = queue.claim("fast")
+    assert fast is not None and fast.task == slow.task
+
+    assert not queue.heartbeat(slow)
+    assert not queue.complete(slow, queue.segment_path(slow))
+    assert queue.complete(fast, queue.segment_path(fast))
+    assert queue.done(JOB.job_id)["seg_00000"]["worker"] == "fast"
+
+
+def test_reclaim_race_restores_a_fresh_claim(tmp_path: Path, monkeypatch):
+    queue = WorkQueue(tmp_path, stale_after_s=30)
+    queue.submit(JOB, segment_frames=100)
+    dead = queue.claim("dead")
+    _age(dead.lock_path, 60)
+
+    # Reclaimer B wins the race between A's stat() and A's rename()
+    real_rename = os.rename
+
+    def _rename_after_b(src, dst):
+        monkeypatch.setattr(distributed.os, "rename", real_rename)
+        Path(src).unlink()
+        assert distributed._create_exclusive(Path(src), {"worker": "b", "token": "b-token"})
+        real_rename(src, dst)
+
+    monkeypatch.setattr(distributed.os, "rename", _rename_after_b)
+    assert queue.claim("a") is None
+    assert distributed._read_json(dead.lock_path)["token"] == "b-token"
+    assert not list(dead.lock_path.parent.glob(".*.stale"))
+
+
+def test_failed_task_is_retried_then_given_up(tmp_path: Path):
+    queue = WorkQueue(tmp_path, max_attempts=2)
+    queue.submit(JOB, segment_frames=100)
+
+    for _ in range(2):
+        claim = queue.claim("w")
+        queue.fail(claim, "boom")
+    assert queue.claim("w") is None
+    assert queue.status(JOB.job_id)["failed"] == 1
+
+
+def test_cancelled_jobs_are_skipped_and_removed_jobs_are_gone(tmp_path: Path):
+    queue = WorkQueue(tmp_path)
+    queue.submit(JOB, segment_frames=10)
+    running = queue.claim("w")
+
+    queue.cancel(JOB.job_id)
+    assert queue.claim("w") is None
+    assert not queue.heartbeat(running)  # The worker abandons its segment
+
+    queue.remove(JOB.job_id)
+    assert not (tmp_path / "jobs" / JOB.job_id).exists()
+    queue.cancel(JOB.job_id)  # No-op once removed
+    assert queue.claim("w") is None
@@ -0,0 +1,123 @@
+import wave
+from pathlib import Path
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from agent.cartesia_tts import CartesiaTTS
+from agent.fake_cartesia import FakeCartesiaConfig, FakeCartesiaProcess, FakeCartesiaServer
+from agent.loadtest import run_tts_load_test
+
+FAST = dict(first_chunk_latency_ms=0, chunk_interval_ms=0)
+
+
+def test_sse_roundtrip_against_fake(tmp_path: Path):
+    with FakeCartesiaServer(FakeCartesiaConfig(**FAST)) as server:
+        tts = CartesiaTTS(api_key="test", base_url=server.base_url)
+        batches = []
+        words = tts.synthesize_with_timestamps(
+            text="Hello there, banker.", voice_id="v", out_wav_path=tmp_path / "a.wav",
+            sample_rate_hz=16000, on_timestamps=batches.append,
+        )
+
+    assert [w.word for w in words] == ["Hello", "there,", "banker."]
+    assert len(batches) > 1  # Delivered incrementally, not in one final event
+    assert all(a.end_ms <= b.start_ms for a, b in zip(words, words[1:]))
+    with wave.open(str(tmp_path / "a.wav"), "rb") as w:
+        assert w.getframerate() == 16000
+        assert w.getnframes() / 16000 * 1000 >= words[-1].end_ms - 10
+
+
+def test_bytes_endpoint_and_error_injection(tmp_path: Path):
+    with FakeCartesiaServer(FakeCartesiaConfig(**FAST)) as server:
+        tts = CartesiaTTS(api_key="test", base_url=server.base_url)
+        out = tts.synthesize_wav(text="Test.", voice_id="v", out_wav_path=tmp_path / "b.wav")
+        with wave.open(str(out), "rb") as w:
+            assert w.getnframes() > 0
+
+    with FakeCartesiaServer(FakeCartesiaConfig(error_rate=1.0, error_status=429, **FAST)) as server:
+        tts = CartesiaTTS(api_key="test", base_url=server.base_url)
+        with pytest.raises(httpx.HTTPStatusError):
+            tts.synthesize_with_timestamps(text="Test.", voice_id="v", out_wav_path=tmp_path / "c.wav")
+        assert server.stats.errors_injected == 1
+
+
+def test_load_test_reports_latency_and_errors():
+    with FakeCartesiaServer(FakeCartesiaConfig(drop_rate=0.5, seed=7, **FAST)) as server:
+        result = run_tts_load_test(
+            CartesiaTTS(api_key="test", base_url=server.base_url),
+            text="One two three four five six seven eight nine ten.",
+            voice_id="v",
+            requests=8,
+            concurrency=4,
+            measure_memory=False,  # Keep the server's drop count to the timed requests
+        )
+        dropped = server.stats.streams_dropped
+
+    summary = result.summary()
+    assert summary["requests"] == 8
+    assert summary["errors"] == dropped
+    assert summary["ttfc_ms"]["p50"] <= summary["total_ms"]["p50"]
+
+
+def test_load_test_against_out_of_process_stand_in():
+    with FakeCartesiaProcess(FakeCartesiaConfig(ms_per_char=10, **FAST)) as server:
+        result = run_tts_load_test(
+            CartesiaTTS(api_key="test", base_url=server.base_url),
+            text="One two three.",
+            voice_id="v",
+            requests=4,
+            concurrency=2,
+        )
+
+    summary = result.summary()
+    assert summary["ok"] == 4
+    assert result.peak_traced_bytes > 0  # From the separate, untimed memory pass
+
+
+def test_websocket_runs_many_contexts_on_one_connection(tmp_path: Path):
+    pytest.importorskip("websockets")
+    from concurrent.futures import ThreadPoolExecutor
+
+    from agent.cartesia_tts import CartesiaStreamError
+
+    with FakeCartesiaServer(FakeCartesiaConfig(**FAST)) as server:
+        tts = CartesiaTTS(api_key="test", base_url=server.base_url)
+        with tts.websocket() as ws:
+            events = list(ws.stream(text="Hello there, banker.", voice_id="v", sample_rate_hz=16000))
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                results = list(pool.map(
+                    lambda i: ws.synthesize_with_timestamps(
+                        text=f"Context number {i} here.", voice_id="v", out_wav_path=tmp_path / f"{i}.wav"),
+                    range(3),
+                ))
+        assert server.stats.ws_connections == 1
+        assert server.stats.by_path["/tts/websocket"] == 4
+
+    assert events[-1].done
+    assert [w.word for e in events for w in e.words] == ["Hello", "there,", "banker."]
+    first_words = next(i for i, e in enumerate(events) if e.words)
+    assert first_words < len(events) - 2  # Words arrive while audio is still streaming
+    assert [[w.word for w in r][1] for r in results] == ["number"] * 3
+    assert (tmp_path / "2.wav").stat().st_size > 44
+
+    with FakeCartesiaServer(FakeCartesiaConfig(error_rate=1.0, error_status=429, **FAST)) as server:
+        with CartesiaTTS(api_key="test", base_url=server.base_url).websocket() as ws:
+            with pytest.raises(CartesiaStreamError, match="429"):
+                list(ws.stream(text="Test.", voice_id="v"))
+
+
+def test_websocket_async_stream():
+    pytest.importorskip("websockets")
+    import asyncio
+
+    async def _collect(base_url: str):
+        async with CartesiaTTS(api_key="test", base_url=base_url).websocket_async() as ws:
+            return [e async for e in ws.stream(text="One two three.", voice_id="v")]
+
+    with FakeCartesiaServer(FakeCartesiaConfig(**FAST)) as server:
+        events = asyncio.run(_collect(server.base_url))
+
+    assert sum(len(e.audio) for e in events) > 0
+    assert [w.word for e in events for w in e.words] == ["One", "two", "three."]
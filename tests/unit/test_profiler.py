@@ -0,0 +1,59 @@
+from agent.profiler import FRAME_MARK, TIMER_MARK, analyze_trace, build_report, normalize_events
+
+
+def _x(name, ts, dur, tid=1, **args):
+    return {"ph": "X", "name": name, "ts": ts * 1000, "dur": dur * 1000, "pid": 1, "tid": tid, "args": args}
+
+
+def _mark(message, ts):
+    return {"ph": "I", "name": "TimeStamp", "ts": ts * 1000, "pid": 1, "tid": 1, "args": {"data": {"message": message}}}
+
+
+def test_analyze_trace_attributes_self_time():
+    trace = {"traceEvents": [
+        _mark(FRAME_MARK + "0", 0),
+        _x("EvaluateScript", 1, 10),
+        _mark(TIMER_MARK + "1:start", 2),
+        _x("Layout", 3, 4, endData={"layoutRoots": [{"nodeId": 7}]}),
+        _mark(TIMER_MARK + "1:end", 8),
+        _x("Paint", 12, 2, data={"nodeId": 9, "layerId": 3}),
+        _x("RasterTask", 13, 6, tid=2, tileData={"layerId": 3}),
+        _mark(FRAME_MARK + "1", 20),
+        _x("Paint", 21, 1, data={"nodeId": 9, "layerId": 3}),
+    ]}
+    events = normalize_events(trace)
+
+    totals, per_frame, per_node, timers = analyze_trace(
+        events, timer_labels={"1": {"label": "setTimeout(520ms) show", "wall_ms": 5.0, "fired_at_ms": 520}}
+    )
+
+    assert totals.script == 6  # 10ms evaluate minus the 4ms forced layout
+    assert totals.layout == 4
+    assert totals.paint == 3
+    assert totals.raster == 6
+    assert [round(f.total) for f in per_frame] == [18, 1]
+    assert per_node[7].layout == 4
+    assert per_node[9].paint == 3 and per_node[9].raster == 6
+    timer = timers["setTimeout(520ms) show"]["cost"]
+    assert (timer.layout, timer.script) == (4, 1)
+
+
+def test_build_report_ranks_css_properties():
+    trace = {"traceEvents": [
+        _mark(FRAME_MARK + "0", 0),
+        _x("Paint", 1, 8, data={"nodeId": 1}),
+        _x("Paint", 10, 1, data={"nodeId": 2}),
+    ]}
+    totals, per_frame, per_node, timers = analyze_trace(normalize_events(trace))
+    report = build_report(
+        fps=30, totals=totals, per_frame=per_frame, per_node=per_node, timers=timers,
+        node_info={
+            1: {"selector": "div.card", "css": {"filter": "blur(20px)", "boxShadow": "0 0 80px #000"}},
+            2: {"selector": "h1#title", "css": {"boxShadow": "0 1px 2px #000"}},
+        },
+    )
+
+    assert [e["selector"] for e in report.elements] == ["div.card", "h1#title"]
+    assert report.css_properties[0]["property"] == "boxShadow"
+    assert report.css_properties[0]["cost"]["paint"] == 9
+    assert report.timeline[0]["paint"] == 9
@@ -0,0 +1,49 @@
+from pathlib import Path
+
+import pytest
+
+from agent.render_manifest import RenderManifest, RenderManifestError
+
+PARAMS = {"duration_ms": 1000, "fps": 30, "width": 1080, "height": 1920, "selector": ".shorts-container"}
+
+
+def test_manifest_roundtrip(tmp_path: Path):
+    path = tmp_path / "render_manifest.json"
+    m = RenderManifest(scene_sha256="abc", params=PARAMS, total_frames=31, frames_done=12)
+    m.mark_stage("encode", frames=31)
+    m.save(path)
+
+    loaded = RenderManifest.load(path)
+    assert loaded.frames_done == 12
+    assert loaded.stage_done("encode", frames=31)
+    assert not loaded.stage_done("encode", frames=40)
+    assert not loaded.stage_done("mux")
+
+
+def test_manifest_validate_rejects_changed_scene_or_fps():
+    m = RenderManifest(scene_sha256="abc", params=PARAMS, total_frames=31)
+    m.validate(scene_sha256="abc", params={**PARAMS, "duration_ms": 5000})
+    with pytest.raises(RenderManifestError):
+        m.validate(scene_sha256="def", params=PARAMS)
+    with pytest.raises(RenderManifestError):
+        m.validate(scene_sha256="abc", params={**PARAMS, "fps": 60})
+
+
+def test_first_missing_frame_checks_disk(tmp_path: Path):
+    for i in range(5):
+        (tmp_path / f"frame_{i:06d}.png").write_bytes(b"png")
+    (tmp_path / "frame_000002.png").unlink()
+    m = RenderManifest(scene_sha256="abc", params=PARAMS, total_frames=31, frames_done=5)
+    assert m.first_missing_frame(tmp_path) == 2
+
+
+def test_first_missing_frame_clamps_to_shorter_render(tmp_path: Path):
+    for i in range(60):
+        (tmp_path / f"frame_{i:06d}.png").write_bytes(b"png")
+    m = RenderManifest(scene_sha256="abc", params=PARAMS, total_frames=31, frames_done=60)
+    assert m.first_missing_frame(tmp_path) == 31
+
+
+def test_load_missing_manifest(tmp_path: Path):
+    with pytest.raises(RenderManifestError):
+        RenderManifest.load(tmp_path / "nope.json")
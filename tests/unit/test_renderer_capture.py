@@ -0,0 +1,141 @@
+import re
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+import pytest
+
+import agent.renderer as renderer
+from agent.render_manifest import MANIFEST_NAME, RenderManifest
+
+
+class _FakePage:
+    """Records virtual-clock seeks; screenshots are placeholder files."""
+
+    def __init__(self) -> None:
+        self.seeks = []
+
+    def evaluate(self, script: str, arg=None):
+        m = re.fullmatch(r"window\.__seekToTime\(([\d.]+)\)", script)
+        if m:
+            self.seeks.append(float(m.group(1)))
+
+    def locator(self, selector: str):
+        return self
+
+    def count(self) -> int:
+        return 0  # No container: full-page screenshots
+
+    def screenshot(self, path: str) -> None:
+        Path(path).write_bytes(b"png")
+
+
+class _FakePlaywright:
+    def __init__(self) -> None:
+        self.chromium = self
+
+    def launch(self, **kwargs):
+        return self
+
+    def new_page(self, **kwargs) -> _FakePage:
+        return _FakePage()
+
+    def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def page(monkeypatch) -> _FakePage:
+    sync_api = pytest.importorskip("playwright.sync_api")
+    page = _FakePage()
+
+    @contextmanager
+    def _open_scene_page(p, html_path, **kwargs):
+        yield page, "http://127.0.0.1/scene.html"
+
+    monkeypatch.setattr(sync_api, "sync_playwright", lambda: nullcontext(None))
+    monkeypatch.setattr(renderer, "open_scene_page", _open_scene_page)
+    monkeypatch.setattr(renderer, "load_scene", lambda *args, **kwargs: None)
+    return page
+
+
+def test_before_frame_runs_ahead_of_each_seek_and_capture_extends(tmp_path: Path, page: _FakePage):
+    calls = []
+
+    def before_frame(p, i, t_ms):
+        assert p is page and len(page.seeks) == i  # Frame i is not seeked yet
+        calls.append((i, t_ms))
+
+    total = renderer.capture_frames_playwright(
+        html_path=tmp_path / "scene.html",
+        frames_dir=tmp_path / "frames",
+        duration_ms=1000,
+        fps=10,
+        before_frame=before_frame,
+        extend_duration_ms=lambda: 1500,
+    )
+
+    assert total == 16
+    assert calls == [(i, i * 100) for i in range(16)]
+    assert page.seeks == [i * 100 for i in range(16)]
+    assert len(list((tmp_path / "frames").glob("frame_*.png"))) == 16
+
+
+def test_segment_capture_never_extends(tmp_path: Path, page: _FakePage):
+    total = renderer.capture_frames_playwright(
+        html_path=tmp_path / "scene.html",
+        frames_dir=tmp_path / "frames",
+        duration_ms=1000,
+        fps=10,
+        start_frame=4,
+        end_frame=8,
+        extend_duration_ms=lambda: pytest.fail("segments have a fixed length"),
+    )
+
+    assert total == 11
+    assert page.seeks == [i * 100 for i in range(8)]  # Fast-forward, then frames 4-7
+    assert sorted(p.name for p in (tmp_path / "frames").iterdir()) == [f"frame_{i:06d}.png" for i in range(4, 8)]
+
+
+def test_render_extends_to_audio_duration_and_encodes_every_frame(tmp_path: Path, page: _FakePage, monkeypatch):
+    commands = []
+    monkeypatch.setattr(renderer.subprocess, "run", lambda cmd, **kwargs: commands.append(cmd))
+    scene = tmp_path / "scene.html"
+    scene.write_text("<body></body>")
+
+    result = renderer.render_mp4(html_path=scene, output_dir=tmp_path, duration_ms=1000, fps=10,
+                                 extend_duration_ms=lambda: 2000)
+
+    assert result.frame_count == 21
+    manifest = RenderManifest.load(tmp_path / MANIFEST_NAME)
+    assert manifest.params["duration_ms"] == 2000
+    assert manifest.total_frames == manifest.frames_done == 21
+    assert manifest.stage_done("encode", frames=21)
+    encode = commands[0]
+    assert encode[encode.index("-frames:v") + 1] == "21"
+
+
+def test_render_never_shrinks_below_requested_duration(tmp_path: Path, page: _FakePage, monkeypatch):
+    monkeypatch.setattr(renderer.subprocess, "run", lambda cmd, **kwargs: None)
+    scene = tmp_path / "scene.html"
+    scene.write_text("<body></body>")
+
+    result = renderer.render_mp4(html_path=scene, output_dir=tmp_path, duration_ms=1000, fps=10,
+                                 extend_duration_ms=lambda: 400)
+
+    assert result.frame_count == 11
+    assert RenderManifest.load(tmp_path / MANIFEST_NAME).params["duration_ms"] == 1000
+
+
+def test_scene_with_references_outside_the_root_falls_back_to_file_url(tmp_path: Path, capsys):
+    scene = tmp_path / "promo" / "scene.html"
+    scene.parent.mkdir()
+    scene.write_text('<img src="../shared/logo.png">')
+
+    with renderer.open_scene_page(_FakePlaywright(), scene, cache_dir=None) as (page, url):
+        assert url == scene.resolve().as_uri()
+    assert "../shared/logo.png" in capsys.readouterr().err
+
+    scene.write_text('<img src="logo.png">')
+    with renderer.open_scene_page(_FakePlaywright(), scene, cache_dir=None) as (page, url):
+        assert url.startswith("http://127.0.0.1:")
+    assert capsys.readouterr().err == ""
@@ -1,6 +1,6 @@
 from pathlib import Path
 
-from agent.renderer import ffmpeg_encode_cmd, ffmpeg_mux_wav_cmd
+from agent.renderer import ffmpeg_concat_cmd, ffmpeg_encode_cmd, ffmpeg_mux_wav_cmd
 
 
 def test_ffmpeg_encode_cmd():
@@ -19,3 +19,22 @@ def test_ffmpeg_mux_cmd():
     assert cmd[-1] == "c.mp4"
 
 
+def test_ffmpeg_encode_cmd_start_number():
+    cmd = ffmpeg_encode_cmd(fps=30, frame_glob="frame_%06d.png", out_mp4=Path("out.mp4"), start_number=150)
+    assert cmd[cmd.index("-start_number") + 1] == "150"
+    assert cmd.index("-start_number") < cmd.index("-i")
+
+
+def test_ffmpeg_encode_cmd_bounds_frame_count():
+    cmd = ffmpeg_encode_cmd(fps=30, frame_glob="frame_%06d.png", out_mp4=Path("out.mp4"), frames=31)
+    assert cmd[cmd.index("-frames:v") + 1] == "31"
+    assert cmd.index("-frames:v") > cmd.index("-i")
+    assert "-frames:v" not in ffmpeg_encode_cmd(fps=30, frame_glob="f_%06d.png", out_mp4=Path("o.mp4"))
+
+
+def test_ffmpeg_concat_cmd():
+    cmd = ffmpeg_concat_cmd(list_file=Path("segments.txt"), out_mp4=Path("video.mp4"))
+    assert cmd[0] == "ffmpeg"
+    assert "concat" in cmd
+    assert cmd[cmd.index("-c") + 1] == "copy"
+    assert cmd[-1] == "video.mp4"
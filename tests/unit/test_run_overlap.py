@@ -0,0 +1,136 @@
+import argparse
+import json
+import threading
+import time
+import wave
+from pathlib import Path
+
+import pytest
+
+import agent.cli as cli
+from agent.cartesia_tts import WordTimestamp
+from agent.renderer import RenderResult
+
+
+def _words(*ends):
+    return [WordTimestamp(word=f"w{end}", start_ms=end - 100, end_ms=end) for end in ends]
+
+
+def _args(**overrides) -> argparse.Namespace:
+    return argparse.Namespace(**{"id": "demo", "debug": True, "postprocess": False, "duration": 1, "fps": 10, **overrides})
+
+
+class _RecordingPage:
+    def __init__(self) -> None:
+        self.voiceovers = []
+
+    def evaluate(self, script: str, arg=None):
+        assert "__shortsSetVoiceover" in script
+        self.voiceovers.append(arg)
+
+
+@pytest.fixture
+def shorts(tmp_path: Path, monkeypatch) -> Path:
+    (tmp_path / "runs" / "demo").mkdir(parents=True)
+    (tmp_path / "runs" / "demo" / "scene.html").write_text("<body></body>")
+    (tmp_path / "renders").mkdir()
+    monkeypatch.setattr(cli, "get_shorts_dir", lambda: tmp_path)
+    return tmp_path
+
+
+def _fake_render(page, frames_seen, *, max_frames=50, frame_s=0.0):
+    """Stand-in for render_mp4: drives the hooks the way the capture loop does."""
+
+    def render_mp4(*, output_dir: Path, duration_ms: int, fps: int, before_frame, extend_duration_ms, **kwargs):
+        total = int(duration_ms / 1000 * fps) + 1
+        i = 0
+        while i < total and i < max_frames:
+            before_frame(page, i, i * 1000 / fps)
+            frames_seen.append((i, time.monotonic()))
+            time.sleep(frame_s)
+            i += 1
+            if i == total:
+                total = max(total, int(extend_duration_ms() / 1000 * fps) + 1)
+        mp4 = output_dir / "video.mp4"
+        mp4.write_bytes(b"mp4")
+        return RenderResult(frames_dir=output_dir / "frames", frame_count=i, mp4_path=mp4, final_mp4_path=None)
+
+    return render_mp4
+
+
+def _finish_tts(shorts: Path, words, *, duration_s: float) -> None:
+    """What cmd_tts leaves behind on success."""
+    with wave.open(str(shorts / "renders" / "demo.wav"), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(8000)
+        w.writeframes(b"\0\0" * int(8000 * duration_s))
+    (shorts / "runs" / "demo" / "tts_words.json").write_text(json.dumps([w.__dict__ for w in words]))
+
+
+def test_progress_wait_blocks_until_words_pass_the_frame():
+    progress = cli._TTSProgress()
+    reached = threading.Event()
+    waiter = threading.Thread(target=lambda: (progress.wait(500), reached.set()))
+    waiter.start()
+
+    progress.add(_words(200, 500))
+    assert not reached.wait(0.1)  # Words must cover the frame's time, not just touch it
+    progress.add(_words(600))
+    assert reached.wait(2)
+    waiter.join()
+
+    progress.finish()
+    progress.wait()  # Done: never blocks, whatever the time
+    progress.wait(10_000)
+
+
+def test_run_frames_wait_for_streamed_words_then_extend_to_the_wav(shorts: Path, monkeypatch):
+    released = threading.Event()
+    words = _words(100, 300, 1200, 1500)
+
+    def fake_tts(args, on_timestamps=None):
+        on_timestamps(words[:2])
+        released.wait(5)
+        on_timestamps(words[2:])
+        _finish_tts(shorts, words, duration_s=1.5)
+        return 0
+
+    page = _RecordingPage()
+    frames = []
+    monkeypatch.setattr(cli, "cmd_tts", fake_tts)
+    monkeypatch.setattr(cli, "render_mp4", _fake_render(page, frames))
+    release_at = time.monotonic() + 0.3
+    threading.Timer(0.3, released.set).start()
+
+    assert cli.cmd_run(_args()) == 0
+
+    # Frames up to 200ms were covered by the first batch; 300ms+ had to wait for the rest
+    assert all(t < release_at for i, t in frames if i <= 2)
+    assert all(t >= release_at for i, t in frames if i >= 3)
+    # Capture ran past --duration to the WAV's 1.5s
+    assert [i for i, _ in frames] == list(range(16))
+    assert page.voiceovers[0] == cli._voiceover_segments([w.__dict__ for w in words[:2]])
+    assert page.voiceovers[-1] == cli._voiceover_segments([w.__dict__ for w in words])
+    assert (shorts / "renders" / "demo.mp4").exists()
+
+
+@pytest.mark.parametrize("debug", [True, False])
+def test_run_tts_failure_aborts_the_render(shorts: Path, monkeypatch, debug: bool):
+    def fake_tts(args, on_timestamps=None):
+        on_timestamps(_words(200))
+        time.sleep(0.1)
+        return 1
+
+    frames = []
+    monkeypatch.setattr(cli, "cmd_tts", fake_tts)
+    monkeypatch.setattr(cli, "render_mp4", _fake_render(_RecordingPage(), frames, max_frames=10_000, frame_s=0.01))
+    result = []
+    runner = threading.Thread(target=lambda: result.append(cli.cmd_run(_args(debug=debug, duration=60))), daemon=True)
+    runner.start()
+    runner.join(10)
+
+    assert not runner.is_alive(), "render hung after TTS failed"
+    assert result == [1]
+    assert len(frames) < 100
+    assert not (shorts / "renders" / "demo.mp4").exists()
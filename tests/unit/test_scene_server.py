@@ -0,0 +1,102 @@
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from agent.scene_server import SceneServer, acquire_profile_slot, serve_root_for, unreachable_references
+
+
+def _get(url: str, headers=None):
+    req = urllib.request.Request(url, headers=headers or {})
+    try:
+        with urllib.request.urlopen(req) as resp:
+            return resp.status, resp.headers, resp.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, b""
+
+
+@pytest.fixture
+def shorts(tmp_path: Path) -> Path:
+    (tmp_path / "runs" / "demo").mkdir(parents=True)
+    (tmp_path / "runs" / "demo" / "scene.html").write_text('<link rel="stylesheet" href="../../assets/a.css">')
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "assets" / "a.css").write_text("body { color: red }")
+    (tmp_path / ".cache" / "assets").mkdir(parents=True)
+    (tmp_path / ".cache" / "assets" / "logo-0123.webp").write_bytes(b"RIFF")
+    (tmp_path / ".env").write_text("CARTESIA_API_KEY=secret")
+    return tmp_path
+
+
+def test_serves_with_etags_and_revalidation(shorts: Path):
+    scene = shorts / "runs" / "demo" / "scene.html"
+    assert serve_root_for(scene) == shorts
+
+    with SceneServer(shorts, immutable_dirs=[shorts / ".cache" / "assets"]) as server:
+        url = server.url_for(scene)
+        assert url == f"{server.base_url}/runs/demo/scene.html"
+
+        status, headers, body = _get(server.base_url + "/assets/a.css")
+        assert (status, body) == (200, b"body { color: red }")
+        assert headers["Content-Type"] == "text/css; charset=utf-8"
+        assert headers["Cache-Control"] == "no-cache"
+        etag = headers["ETag"]
+
+        status, headers, _ = _get(server.base_url + "/assets/a.css", {"If-None-Match": etag})
+        assert status == 304 and headers["ETag"] == etag
+
+        (shorts / "assets" / "a.css").write_text("body { color: blue }")
+        status, headers, _ = _get(server.base_url + "/assets/a.css", {"If-None-Match": etag})
+        assert status == 200 and headers["ETag"] != etag
+
+        _, headers, _ = _get(server.base_url + "/.cache/assets/logo-0123.webp")
+        assert "immutable" in headers["Cache-Control"]
+        assert server.stats.not_modified == 1
+
+        with pytest.raises(ValueError):
+            server.url_for(shorts.parent / "elsewhere.html")
+
+
+def test_never_serves_outside_root_or_hidden_files(shorts: Path):
+    with SceneServer(shorts / "runs") as server:
+        assert _get(server.base_url + "/demo/scene.html")[0] == 200
+        assert _get(server.base_url + "/../assets/a.css")[0] == 404
+        assert _get(server.base_url + "/demo/%2e%2e/%2e%2e/assets/a.css")[0] == 404
+        assert _get(server.base_url + "/demo/")[0] == 404
+    with SceneServer(shorts) as server:
+        assert _get(server.base_url + "/.env")[0] == 404
+        assert _get(server.base_url + "/.cache/assets/logo-0123.webp")[0] == 404
+
+    cookies = shorts / ".cache" / "browser" / "profile-0" / "Default" / "Cookies"
+    cookies.parent.mkdir(parents=True)
+    cookies.write_bytes(b"SQLite format 3")
+    with SceneServer(shorts, immutable_dirs=[shorts / ".cache" / "assets"]) as server:
+        assert _get(server.base_url + "/.cache/assets/logo-0123.webp")[0] == 200
+        assert _get(server.base_url + "/.cache/browser/profile-0/Default/Cookies")[0] == 404
+        assert _get(server.base_url + "/.cache/assets/%2e%2e/browser/profile-0/Default/Cookies")[0] == 404
+
+
+def test_unreachable_references_outside_the_served_root(shorts: Path, tmp_path_factory):
+    scene = shorts / "runs" / "demo" / "scene.html"
+    assert unreachable_references(scene, serve_root_for(scene)) == []
+
+    elsewhere = tmp_path_factory.mktemp("scenes") / "promo"
+    elsewhere.mkdir()
+    loose = elsewhere / "scene.html"
+    loose.write_text(
+        '<img src="img/a.png"><img src="https://x.test/b.png"><a href="#top"></a>'
+        '<img src="../shared/logo.png"><div style="background: url(\'/abs/bg.png\')"></div>'
+        '<script src="file:///opt/lib.js"></script>'
+    )
+    assert serve_root_for(loose) == elsewhere
+    assert unreachable_references(loose, elsewhere) == ["../shared/logo.png", "/abs/bg.png", "file:///opt/lib.js"]
+
+
+def test_profile_slots_are_exclusive_with_stable_ports(tmp_path: Path):
+    pytest.importorskip("fcntl")
+    with acquire_profile_slot(tmp_path, max_slots=2) as a, acquire_profile_slot(tmp_path, max_slots=2) as b:
+        assert a.profile_dir != b.profile_dir and b.port == a.port + 1
+        with acquire_profile_slot(tmp_path, max_slots=2) as c:
+            assert c is None  # All busy: caller falls back to a throwaway profile
+    with acquire_profile_slot(tmp_path, max_slots=2) as again:
+        assert again == a  # Released slots are reused, port included